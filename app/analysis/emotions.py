@@ -1,23 +1,44 @@
-from typing import List
+from typing import Dict, List
 import pandas as pd
-from transformers import pipeline
+from app.utils.cache import open_result_cache, result_cache_key
+from .models import get_pipeline, model_variant_tag, token_length_order
 
 
 class EmotionDetector:
-	def __init__(self, model_name: str = "j-hartmann/emotion-english-distilroberta-base"):
+	def __init__(self, model_name: str = "j-hartmann/emotion-english-distilroberta-base", batch_size: int = 32, device: int = -1, quantize: bool = False, cache_dir: str | None = None):
 		self.model_name = model_name
-		self._pipeline = pipeline("text-classification", model=self.model_name, top_k=None)
+		self.batch_size = batch_size
+		self._pipeline = get_pipeline("text-classification", self.model_name, device, quantize)
+		# Predicted labels keyed by model variant and text, reused across runs
+		self._cache = open_result_cache(cache_dir, "emotions")
+		self._cache_tag = model_variant_tag(self.model_name, device, quantize)
 
 	def predict(self, texts: List[str]) -> List[str]:
-		results = self._pipeline(texts)
-		labels = []
-		for res in results:
+		labels: List[str] = [""] * len(texts)
+		# Cached texts skip the model and each new text is scored once
+		pending: Dict[str, List[int]] = {}
+		for i, text in enumerate(texts):
+			cached = self._cache.get(result_cache_key(self._cache_tag, text))
+			if cached is not None:
+				labels[i] = cached
+			else:
+				pending.setdefault(text, []).append(i)
+		if not pending:
+			return labels
+		unique = list(pending)
+		# Sort by token count so each batch pads to similar sizes, then restore input order
+		order = token_length_order(self._pipeline, unique)
+		results = self._pipeline((unique[j] for j in order), batch_size=self.batch_size)
+		for j, res in zip(order, results):
 			if isinstance(res, list):
 				res = max(res, key=lambda x: x.get("score", 0))
-			labels.append(res["label"])
+			self._cache[result_cache_key(self._cache_tag, unique[j])] = res["label"]
+			for i in pending[unique[j]]:
+				labels[i] = res["label"]
 		return labels
 
+	def predict_columns(self, texts: List[str]) -> Dict[str, List[str]]:
+		return {"emotion_label": self.predict(texts)}
+
 	def add_to_dataframe(self, df: pd.DataFrame, text_col: str = "clean_text") -> pd.DataFrame:
-		df = df.copy()
-		df["emotion_label"] = self.predict(df[text_col].fillna("").astype(str).tolist())
-		return df
+		return df.assign(**self.predict_columns(df[text_col].fillna("").astype(str).tolist()))
@@ -0,0 +1,117 @@
+import functools
+import os
+from typing import Iterable, List
+from transformers import AutoTokenizer, pipeline
+
+try:
+	import torch
+	_torch_available = True
+except Exception:
+	torch = None  # type: ignore
+	_torch_available = False
+
+try:
+	from optimum.bettertransformer import BetterTransformer
+	_bettertransformer_available = True
+except Exception:
+	_bettertransformer_available = False
+
+try:
+	import onnxruntime as ort
+	from optimum.onnxruntime import ORTModelForSequenceClassification, ORTQuantizer
+	from optimum.onnxruntime.configuration import AutoQuantizationConfig
+	_onnxruntime_available = True
+except Exception:
+	_onnxruntime_available = False
+
+
+@functools.lru_cache(maxsize=1)
+def _cpu_supports_bf16() -> bool:
+	"""True when the CPU has native bf16 math (AVX512-BF16 or AMX)."""
+	try:
+		with open("/proc/cpuinfo") as f:
+			flags = f.read()
+	except OSError:
+		return False
+	return "avx512_bf16" in flags or "amx_bf16" in flags
+
+
+def inference_dtype(device: int = -1):
+	"""Half precision where the hardware runs it natively: fp16 on GPU, bf16 on capable CPUs, else fp32."""
+	if not _torch_available:
+		return None
+	if device != -1 and torch.cuda.is_available():
+		return torch.float16
+	if device == -1 and _cpu_supports_bf16():
+		return torch.bfloat16
+	return None
+
+
+def model_variant_tag(model_name: str, device: int = -1, quantize: bool = False) -> str:
+	"""Describe the model, dtype and quantization `get_pipeline` serves, for prediction cache keys."""
+	dtype = inference_dtype(device)
+	int8 = quantize and _torch_available and device == -1 and dtype is None
+	return f"{model_name}|device={device}|dtype={dtype or 'float32'}|int8={int8}"
+
+
+def token_length_order(pipe, texts: List[str], indices: Iterable[int] | None = None, max_length: int = 512) -> List[int]:
+	"""Indices of `texts` sorted by tokenized length (capped at `max_length`), so each batch pads to similar sizes."""
+	indices = list(range(len(texts))) if indices is None else list(indices)
+	tokenizer = getattr(pipe, "tokenizer", None)
+	if tokenizer is None or not indices:
+		return sorted(indices, key=lambda i: len(texts[i]))
+	input_ids = tokenizer([texts[i] for i in indices], add_special_tokens=False, truncation=True, max_length=max_length)["input_ids"]
+	return [indices[j] for j in sorted(range(len(indices)), key=lambda j: len(input_ids[j]))]
+
+
+@functools.lru_cache(maxsize=4)
+def get_pipeline(task: str, model_name: str, device: int = -1, quantize: bool = False):
+	"""Load a transformers pipeline once per (task, model, device, quantize) and share it across instances.
+
+	With `quantize`, fp32 CPU models get int8 dynamic quantization of their Linear layers.
+	"""
+	kwargs = {}
+	dtype = inference_dtype(device)
+	if dtype is not None:
+		kwargs["torch_dtype"] = dtype
+	pipe = pipeline(task, model=model_name, device=device, top_k=None, truncation=True, **kwargs)
+	if quantize and _torch_available and device == -1 and dtype is None:
+		try:
+			pipe.model = torch.ao.quantization.quantize_dynamic(pipe.model, {torch.nn.Linear}, dtype=torch.qint8)
+			return pipe
+		except Exception as e:
+			print(f"Dynamic quantization not applied: {e}")
+	if _bettertransformer_available:
+		# Fused attention kernels; models that already use native SDPA are left as is
+		try:
+			pipe.model = BetterTransformer.transform(pipe.model)
+		except Exception as e:
+			print(f"BetterTransformer not applied: {e}")
+	return pipe
+
+
+@functools.lru_cache(maxsize=4)
+def get_onnx_pipeline(task: str, model_name: str, onnx_path: str, quantize: bool = False):
+	"""Load a sequence-classification pipeline running on ONNX Runtime.
+
+	The model is exported to `onnx_path` on first use and loaded from there afterwards.
+	With `quantize`, an int8 dynamically quantized copy is saved alongside and used instead.
+	"""
+	if not _onnxruntime_available:
+		raise RuntimeError("optimum[onnxruntime] is not installed")
+	options = ort.SessionOptions()
+	options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+	options.intra_op_num_threads = max(1, (os.cpu_count() or 2) // 2)
+	if not os.path.isdir(onnx_path):
+		model = ORTModelForSequenceClassification.from_pretrained(model_name, export=True)
+		model.save_pretrained(onnx_path)
+		AutoTokenizer.from_pretrained(model_name).save_pretrained(onnx_path)
+	file_name = "model.onnx"
+	if quantize:
+		file_name = "model_quantized.onnx"
+		if not os.path.exists(os.path.join(onnx_path, file_name)):
+			qconfig = AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+			ORTQuantizer.from_pretrained(onnx_path).quantize(save_dir=onnx_path, quantization_config=qconfig)
+	model = ORTModelForSequenceClassification.from_pretrained(onnx_path, file_name=file_name, session_options=options)
+	tokenizer = AutoTokenizer.from_pretrained(onnx_path)
+	return pipeline(task, model=model, tokenizer=tokenizer, top_k=None, truncation=True)
@@ -1,68 +1,162 @@
-from typing import List, Dict
+from typing import List, Dict, Tuple
+import itertools
+import os
+import numpy as np
 import pandas as pd
 import re
 
+from app.utils.cache import open_result_cache, result_cache_key
+
+# Punctuation runs stay in the token stream so a negation never pairs across them
+TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]+")
+
+# Word kinds used by the negation kernel
+KIND_OTHER, KIND_POSITIVE, KIND_NEGATIVE, KIND_NEGATION = 0, 1, -1, 2
+
+try:
+	from numba import njit
+	_numba_available = True
+except Exception:
+	_numba_available = False
+
+	def njit(*args, **kwargs):
+		"""Stand-in decorator so the kernels run as plain Python without numba."""
+		if args and callable(args[0]):
+			return args[0]
+		return lambda fn: fn
+
+
+@njit(cache=True)
+def _count_polarity(ids, kind):
+	"""Single scan over a token-id stream: distinct polarity words, flipped when a negation precedes them."""
+	seen = np.zeros(len(kind), dtype=np.bool_)
+	pos_count = 0
+	neg_count = 0
+	for j in range(len(ids)):
+		token = ids[j]
+		if token < 0:
+			continue
+		if not seen[token]:
+			seen[token] = True
+			if kind[token] == KIND_POSITIVE:
+				pos_count += 1
+			elif kind[token] == KIND_NEGATIVE:
+				neg_count += 1
+		if kind[token] == KIND_NEGATION and j + 1 < len(ids) and ids[j + 1] >= 0:
+			next_kind = kind[ids[j + 1]]
+			if next_kind == KIND_POSITIVE:
+				pos_count -= 1
+				neg_count += 1
+			elif next_kind == KIND_NEGATIVE:
+				neg_count -= 1
+				pos_count += 1
+	return pos_count, neg_count
+
 
 class SentimentAnalyzer:
 	"""Hybrid sentiment analyzer using rule-based and ML approaches."""
 
-	def __init__(self, model_name: str = "cardiffnlp/twitter-roberta-base-sentiment-latest", device: int | None = None):
+	def __init__(self, model_name: str = "cardiffnlp/twitter-roberta-base-sentiment-latest", device: int | None = None, onnx_path: str | None = None, quantize: bool = False, cache_dir: str | None = None):
 		self.model_name = model_name
 		self._pipeline = None
 		self.is_rating_model = False
+		# Identifies the loaded backend (model, runtime, dtype, quantization) in cache keys
+		self._cache_tag = ""
+		
+		# Prefer an ONNX Runtime export when a path is configured
+		if onnx_path:
+			try:
+				from .models import get_onnx_pipeline
+				self._pipeline = get_onnx_pipeline("sentiment-analysis", self.model_name, onnx_path, quantize)
+				self._cache_tag = f"{self.model_name}|onnx={os.path.abspath(onnx_path)}|int8={quantize}"
+				print("Loaded ONNX Runtime sentiment model")
+			except Exception as e:
+				print(f"Failed to load ONNX model: {e}. Using PyTorch model.")
 		
 		# Try to load transformer model
-		try:
-			from transformers import pipeline
-			self._pipeline = pipeline(
-				"sentiment-analysis",
-				model=self.model_name,
-				top_k=None,
-				device=device if device is not None else -1,
-			)
-			print("Loaded transformer sentiment model")
-		except Exception as e:
-			print(f"Failed to load transformer model: {e}. Using rule-based approach.")
+		if self._pipeline is None:
+			try:
+				from .models import get_pipeline, model_variant_tag
+				device = device if device is not None else -1
+				self._pipeline = get_pipeline("sentiment-analysis", self.model_name, device, quantize)
+				self._cache_tag = model_variant_tag(self.model_name, device, quantize)
+				print("Loaded transformer sentiment model")
+			except Exception as e:
+				print(f"Failed to load transformer model: {e}. Using rule-based approach.")
+		
+		# Transformer predictions keyed by model variant and text, reused across runs
+		self._cache = {}
+		if self._pipeline is not None:
+			self._cache = open_result_cache(cache_dir, "sentiment")
 		
 		# Define sentiment keywords
-		self.negative_words = {
+		self.negative_words = frozenset({
 			'bad', 'terrible', 'awful', 'horrible', 'disappointed', 'frustrated', 'angry',
 			'broken', 'damaged', 'late', 'slow', 'poor', 'worst', 'hate', 'dislike',
 			'problem', 'issue', 'complaint', 'refund', 'return', 'failed', 'error',
 			'confusing', 'difficult', 'hard', 'impossible', 'useless', 'waste',
 			'expensive', 'overpriced', 'ripoff', 'scam', 'cheap', 'low quality',
 			'long lines', 'wait', 'delayed', 'missing', 'out of stock', 'unavailable'
-		}
+		})
 		
-		self.positive_words = {
+		self.positive_words = frozenset({
 			'good', 'great', 'excellent', 'amazing', 'wonderful', 'fantastic', 'love',
 			'perfect', 'best', 'awesome', 'outstanding', 'brilliant', 'superb',
 			'helpful', 'friendly', 'quick', 'fast', 'easy', 'simple', 'convenient',
 			'satisfied', 'happy', 'pleased', 'impressed', 'recommend', 'worth',
 			'quality', 'reliable', 'professional', 'responsive', 'supportive'
-		}
+		})
+		
+		# Precompile keyword sets so each text is scanned once per polarity
+		self.negation_words = frozenset({'not', 'no', 'never', 'none', 'nothing', 'nobody', 'nowhere'})
+		# Multi-word phrases never equal a single token, so they get their own small scan
+		self._pos_phrase_re = self._phrase_pattern(self.positive_words)
+		self._neg_phrase_re = self._phrase_pattern(self.negative_words)
+		# Integer-encoded vocabulary for the token kernel; unknown tokens map to -1
+		self._vocab = {w: i for i, w in enumerate(sorted(self.positive_words | self.negative_words | self.negation_words))}
+		self._kind = np.array([
+			KIND_POSITIVE if w in self.positive_words else KIND_NEGATIVE if w in self.negative_words else KIND_NEGATION
+			for w in self._vocab
+		], dtype=np.int8)
+
+	@staticmethod
+	def _word_pattern(words) -> re.Pattern:
+		"""Compile whole-word alternation, longest phrases first."""
+		return re.compile(r"\b(" + "|".join(map(re.escape, sorted(words, key=len, reverse=True))) + r")\b")
+
+	@classmethod
+	def _phrase_pattern(cls, words) -> re.Pattern | None:
+		phrases = [w for w in words if " " in w]
+		return cls._word_pattern(phrases) if phrases else None
+
+	def _rule_based_batch(self, texts: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+		"""Vectorised `_rule_based_sentiment` over a column; returns (labels, scores)."""
+		lower = texts.fillna("").astype(str).str.lower()
+		counts = np.fromiter(
+			itertools.chain.from_iterable(map(self._analyze_tokens, lower)), dtype=np.int64, count=2 * len(lower)
+		).reshape(-1, 2)
+		pos_counts, neg_counts = counts[:, 0], counts[:, 1]
+		
+		labels = np.where(neg_counts > pos_counts, "NEGATIVE", np.where(pos_counts > neg_counts, "POSITIVE", "NEUTRAL"))
+		scores = np.where(labels == "NEUTRAL", 0.5, np.minimum(0.9, 0.5 + np.abs(pos_counts - neg_counts) * 0.1))
+		return labels, scores
+
+	def _analyze_tokens(self, text_lower: str) -> Tuple[int, int]:
+		"""Tokenize once and return negation-adjusted (pos_count, neg_count) for a lowercased text."""
+		stream = TOKEN_PATTERN.findall(text_lower)
+		ids = np.fromiter(map(self._vocab.get, stream, itertools.repeat(-1)), dtype=np.int32, count=len(stream))
+		pos_count, neg_count = _count_polarity(ids, self._kind)
+		if self._pos_phrase_re is not None:
+			pos_count += len(set(self._pos_phrase_re.findall(text_lower)))
+		if self._neg_phrase_re is not None:
+			neg_count += len(set(self._neg_phrase_re.findall(text_lower)))
+		return pos_count, neg_count
 
 	def _rule_based_sentiment(self, text: str) -> Dict:
 		"""Rule-based sentiment analysis using keyword matching."""
 		text_lower = text.lower()
 		
-		# Count positive and negative words
-		pos_count = sum(1 for word in self.positive_words if word in text_lower)
-		neg_count = sum(1 for word in self.negative_words if word in text_lower)
-		
-		# Check for negation patterns
-		negation_words = {'not', 'no', 'never', 'none', 'nothing', 'nobody', 'nowhere'}
-		words = text_lower.split()
-		
-		for i, word in enumerate(words):
-			if word in negation_words and i + 1 < len(words):
-				next_word = words[i + 1]
-				if next_word in self.positive_words:
-					pos_count -= 1
-					neg_count += 1
-				elif next_word in self.negative_words:
-					neg_count -= 1
-					pos_count += 1
+		pos_count, neg_count = self._analyze_tokens(text_lower)
 		
 		# Determine sentiment
 		if neg_count > pos_count:
@@ -72,49 +166,84 @@ class SentimentAnalyzer:
 		else:
 			return {"label": "NEUTRAL", "score": 0.5}
 
-	def predict(self, texts: List[str]) -> List[Dict]:
+	@staticmethod
+	def _normalize_label(res) -> Dict:
+		"""Map a raw transformer prediction to a NEGATIVE/POSITIVE/NEUTRAL dict."""
+		if isinstance(res, list):
+			res = max(res, key=lambda x: x.get("score", 0))
+		
+		label = res["label"].upper()
+		score = float(res["score"])
+		
+		# Convert common labels
+		if "NEGATIVE" in label or "NEG" in label:
+			label = "NEGATIVE"
+		elif "POSITIVE" in label or "POS" in label:
+			label = "POSITIVE"
+		else:
+			label = "NEUTRAL"
+		return {"label": label, "score": score}
+
+	def predict(self, texts: List[str], batch_size: int = 32) -> List[Dict]:
 		"""Return list of dicts with label and score using hybrid approach."""
-		results = []
+		results: List[Dict] = [{"label": "NEUTRAL", "score": 0.5} for _ in texts]
+		
+		# Empty texts keep the neutral default
+		order = [i for i, text in enumerate(texts) if text and text.strip()]
+		if not order:
+			return results
 		
-		for text in texts:
-			if not text or len(text.strip()) == 0:
-				results.append({"label": "NEUTRAL", "score": 0.5})
-				continue
-			
-			# Try transformer model first
-			if self._pipeline is not None:
-				try:
-					res = self._pipeline([text])[0]
-					if isinstance(res, list):
-						res = max(res, key=lambda x: x.get("score", 0))
-					
-					label = res["label"].upper()
-					score = float(res["score"])
-					
-					# Convert common labels
-					if "NEGATIVE" in label or "NEG" in label:
-						label = "NEGATIVE"
-					elif "POSITIVE" in label or "POS" in label:
-						label = "POSITIVE"
-					else:
-						label = "NEUTRAL"
-					
-					results.append({"label": label, "score": score})
-					continue
-				except Exception as e:
-					print(f"Transformer model failed for text: {e}")
-			
-			# Fallback to rule-based
-			results.append(self._rule_based_sentiment(text))
+		# Try transformer model first, in a single batched call
+		if self._pipeline is not None:
+			from .models import token_length_order
+			# Cached texts skip the model and each new text is scored once
+			pending: Dict[str, List[int]] = {}
+			for i in order:
+				cached = self._cache.get(result_cache_key(self._cache_tag, texts[i]))
+				if cached is not None:
+					results[i] = {"label": cached[0], "score": cached[1]}
+				else:
+					pending.setdefault(texts[i], []).append(i)
+			if not pending:
+				return results
+			unique = list(pending)
+			try:
+				# Sorted by token count so each batch pads to similar sizes
+				unique_order = token_length_order(self._pipeline, unique, max_length=256)
+				preds = self._pipeline(
+					[unique[j] for j in unique_order],
+					batch_size=batch_size,
+					truncation=True,
+					max_length=256,
+				)
+				for j, res in zip(unique_order, preds):
+					pred = self._normalize_label(res)
+					self._cache[result_cache_key(self._cache_tag, unique[j])] = (pred["label"], pred["score"])
+					for i in pending[unique[j]]:
+						results[i] = dict(pred)
+				return results
+			except Exception as e:
+				print(f"Transformer model failed for batch: {e}")
+			order = [i for rows in pending.values() for i in rows]
+		
+		# Fallback to rule-based
+		labels, scores = self._rule_based_batch(pd.Series([texts[i] for i in order], dtype=object))
+		for i, label, score in zip(order, labels, scores):
+			results[i] = {"label": str(label), "score": float(score)}
 		
 		return results
 
+	def predict_columns(self, texts: List[str]) -> Dict[str, list]:
+		"""Return the `sentiment_label` and `sentiment_score` columns for `texts`."""
+		if self._pipeline is None:
+			# No transformer: score the whole column without a Python row loop
+			labels, scores = self._rule_based_batch(pd.Series(texts, dtype=object))
+		else:
+			preds = self.predict(texts)
+			labels = [p["label"] for p in preds]
+			scores = [p["score"] for p in preds]
+		return {"sentiment_label": labels, "sentiment_score": scores}
+
 	def add_to_dataframe(self, df: pd.DataFrame, text_col: str = "clean_text") -> pd.DataFrame:
 		"""Add `sentiment_label` and `sentiment_score` columns to df."""
-		preds = self.predict(df[text_col].fillna("").astype(str).tolist())
-		labels = [p["label"] for p in preds]
-		scores = [p["score"] for p in preds]
-		df = df.copy()
-		df["sentiment_label"] = labels
-		df["sentiment_score"] = scores
-		return df
+		return df.assign(**self.predict_columns(df[text_col].fillna("").astype(str).tolist()))
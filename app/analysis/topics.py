@@ -1,29 +1,133 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
+import hashlib
+import os
+import joblib
 import pandas as pd
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.cluster import KMeans
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.pipeline import make_pipeline
 from sklearn.metrics.pairwise import cosine_similarity
 
+from app.utils.cache import open_result_cache
+
+# In-memory embedding cache entries (384 float32 each for MiniLM) when diskcache is unavailable
+EMBEDDING_CACHE_SIZE = 16384
+# Fitted BERTopic models kept under cache_dir; the least recently used are deleted beyond this
+TOPIC_MODEL_CACHE_FILES = 8
+
 
 class TopicModeler:
-	def __init__(self, embedding_model: str = "all-MiniLM-L6-v2", seed: int = 42):
+	def __init__(self, embedding_model: str = "all-MiniLM-L6-v2", seed: int = 42, cache_dir: str | None = None, precision: str = "fp16"):
 		self.seed = seed
+		self.embedding_model = embedding_model
+		self.precision = precision  # "fp16": half precision where the hardware runs it natively; "fp32": always full
+		self.cache_dir = cache_dir
 		self._model = None
+		self._encoder = None
+		# Sentence embeddings keyed by model and text hash, so repeated feedback skips the encoder;
+		# kept on disk under cache_dir when diskcache is installed, else in a bounded LRU
+		self._embedding_cache = open_result_cache(cache_dir, "embeddings", maxsize=EMBEDDING_CACHE_SIZE)
+		self._tag: str | None = None
+
+	def _embedding_tag(self) -> str:
+		"""Encoder model, precision and resolved dtype the embeddings come from, for cache keys."""
+		if self._tag is None:
+			dtype = None
+			if self.precision != "fp32":
+				try:
+					import torch
+					from .models import inference_dtype
+					# Same choice as _get_encoder: SentenceTransformer runs on CUDA when available
+					dtype = inference_dtype(0 if torch.cuda.is_available() else -1)
+				except Exception:
+					dtype = None
+			self._tag = f"{self.embedding_model}|precision={self.precision}|dtype={dtype or 'float32'}"
+		return self._tag
+
+	def _text_hash(self, text: str) -> str:
+		return hashlib.sha1(f"{self._embedding_tag()}\0{text}".encode("utf-8")).hexdigest()
+
+	def _get_encoder(self):
+		if self._encoder is None:
+			from sentence_transformers import SentenceTransformer
+			encoder = SentenceTransformer(self.embedding_model)
+			if self.precision != "fp32":
+				from .models import inference_dtype
+				# fp16 on GPU, bf16 on CPUs with native bf16 math
+				dtype = inference_dtype(0 if encoder.device.type == "cuda" else -1)
+				if dtype is not None:
+					encoder = encoder.to(dtype)
+			self._encoder = encoder
+		return self._encoder
+
+	def _embed(self, texts: List[str]) -> np.ndarray:
+		"""Embed texts, encoding only those not already in the embedding cache."""
+		hashes = [self._text_hash(t) for t in texts]
+		# Collected locally, since the bounded cache may evict entries before the stack
+		found: Dict[str, np.ndarray] = {}
+		missing: Dict[str, str] = {}
+		for h, t in zip(hashes, texts):
+			if h in found or h in missing:
+				continue
+			cached = self._embedding_cache.get(h)
+			if cached is None:
+				missing[h] = t
+			else:
+				found[h] = cached
+		if missing:
+			encoded = self._get_encoder().encode(list(missing.values()), batch_size=64, show_progress_bar=False)
+			encoded = np.asarray(encoded, dtype=np.float32)
+			for h, e in zip(missing.keys(), encoded):
+				found[h] = e
+				self._embedding_cache[h] = e
+		return np.vstack([found[h] for h in hashes])
+
+	def _model_path(self, texts: List[str]) -> str | None:
+		"""Location of the persisted model for this exact training corpus."""
+		if not self.cache_dir:
+			return None
+		corpus_hash = hashlib.sha1("\0".join([self._embedding_tag(), *texts]).encode("utf-8")).hexdigest()
+		return os.path.join(self.cache_dir, f"bertopic-{corpus_hash}.joblib")
+
+	def _evict_models(self) -> None:
+		"""Delete the least recently used persisted models beyond TOPIC_MODEL_CACHE_FILES."""
+		paths = [
+			os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir)
+			if name.startswith("bertopic-") and name.endswith(".joblib")
+		]
+		paths.sort(key=os.path.getmtime, reverse=True)
+		for stale in paths[TOPIC_MODEL_CACHE_FILES:]:
+			try:
+				os.remove(stale)
+			except OSError:
+				pass
+
+	def _attach_encoder(self, model) -> None:
+		"""Give a model loaded from disk the shared encoder, which is not saved with it."""
+		from bertopic.backend._utils import select_backend
+		model.embedding_model = select_backend(self._get_encoder())
+
+	@staticmethod
+	def _to_frame(topics, probs) -> pd.DataFrame:
+		return pd.DataFrame({"topic": topics, "topic_prob": [float(p.max()) if p is not None else 0.0 for p in probs]})
 
 	def _simple_topic_modeling(self, texts: List[str]) -> pd.DataFrame:
-		"""Simple topic modeling using TF-IDF and K-means for small datasets."""
+		"""Simple topic modeling using hashed TF-IDF and mini-batch K-means for small datasets."""
 		n_texts = len(texts)
 		
 		if n_texts <= 1:
 			return pd.DataFrame({"topic": [0] * n_texts, "topic_prob": [1.0] * n_texts})
 		
-		# Use TF-IDF for feature extraction
-		vectorizer = TfidfVectorizer(
-			max_features=100,
-			stop_words='english',
-			ngram_range=(1, 2),
-			min_df=1
+		# Hashed TF-IDF features: single pass, no vocabulary to build
+		vectorizer = make_pipeline(
+			HashingVectorizer(
+				n_features=512,
+				alternate_sign=False,
+				stop_words='english',
+				ngram_range=(1, 2)
+			),
+			TfidfTransformer()
 		)
 		
 		try:
@@ -32,14 +136,20 @@ class TopicModeler:
 			# Determine number of topics (max 3 for small datasets)
 			n_topics = min(3, max(1, n_texts // 2))
 			
-			# Use K-means clustering
-			kmeans = KMeans(n_clusters=n_topics, random_state=self.seed, n_init=10)
+			# Use mini-batch K-means clustering
+			kmeans = MiniBatchKMeans(n_clusters=n_topics, random_state=self.seed, n_init=3, batch_size=min(256, n_texts))
 			topics = kmeans.fit_predict(tfidf_matrix)
 			
-			# Calculate topic probabilities based on distance to centroids
-			distances = kmeans.transform(tfidf_matrix)
+			# Calculate topic probabilities from the distance to each text's own centroid,
+			# using ||x - c||^2 = x.x - 2 x.c + c.c on the sparse rows
+			centers = kmeans.cluster_centers_[topics]
+			sq_dists = (
+				np.asarray(tfidf_matrix.multiply(tfidf_matrix).sum(axis=1)).ravel()
+				- 2 * np.asarray(tfidf_matrix.multiply(centers).sum(axis=1)).ravel()
+				+ np.einsum("ij,ij->i", centers, centers)
+			)
 			# Convert distances to probabilities (closer = higher probability)
-			probs = 1 / (1 + distances.min(axis=1))
+			probs = 1 / (1 + np.sqrt(np.maximum(sq_dists, 0)))
 			probs = probs / probs.sum() * n_texts  # Normalize
 			
 			return pd.DataFrame({
@@ -64,12 +174,22 @@ class TopicModeler:
 		
 		# For larger datasets, try BERTopic with better error handling
 		try:
+			# Reuse the model fitted on this exact corpus in an earlier run
+			path = self._model_path(texts)
+			if path and os.path.exists(path):
+				cached = joblib.load(path)
+				os.utime(path)  # mark as recently used for _evict_models
+				self._attach_encoder(cached["model"])
+				self._model = cached["model"]
+				for h, e in zip(map(self._text_hash, texts), cached["embeddings"]):
+					self._embedding_cache[h] = e
+				return self._to_frame(cached["topics"], cached["probs"])
+			
 			from bertopic import BERTopic
-			from sentence_transformers import SentenceTransformer
 			from umap import UMAP
 			from hdbscan import HDBSCAN
 			
-			embedding_model = SentenceTransformer("all-MiniLM-L6-v2")
+			embeddings = self._embed(texts)
 			
 			umap_model = UMAP(
 				n_components=5,
@@ -84,19 +204,29 @@ class TopicModeler:
 				min_cluster_size=10,
 				min_samples=5,
 				metric='euclidean',
-				cluster_selection_method='eom'
+				cluster_selection_method='eom',
+				prediction_data=True
 			)
 			
 			model = BERTopic(
-				embedding_model=embedding_model,
+				embedding_model=self._get_encoder(),
 				umap_model=umap_model,
 				hdbscan_model=hdbscan_model,
 				calculate_probabilities=True,
 				verbose=False
 			)
 			self._model = model
-			topics, probs = model.fit_transform(texts)
-			return pd.DataFrame({"topic": topics, "topic_prob": [float(p.max()) if p is not None else 0.0 for p in probs]})
+			topics, probs = model.fit_transform(texts, embeddings=embeddings)
+			if path:
+				os.makedirs(self.cache_dir, exist_ok=True)
+				# Saved without the encoder, which is large and rebuilt from embedding_model on load
+				encoder, model.embedding_model = model.embedding_model, None
+				try:
+					joblib.dump({"model": model, "embeddings": embeddings, "topics": topics, "probs": probs}, path)
+				finally:
+					model.embedding_model = encoder
+				self._evict_models()
+			return self._to_frame(topics, probs)
 			
 		except Exception as e:
 			print(f"BERTopic failed: {e}. Using simple topic modeling.")
@@ -108,9 +238,10 @@ class TopicModeler:
 			raise RuntimeError("Topic model is not fitted yet.")
 		return self._model
 
+	def predict_columns(self, texts: List[str]) -> Dict[str, np.ndarray]:
+		"""Fit on `texts` and return the `topic` and `topic_prob` columns."""
+		res = self.fit_transform(texts)
+		return {"topic": res["topic"].values, "topic_prob": res["topic_prob"].values}
+
 	def add_to_dataframe(self, df: pd.DataFrame, text_col: str = "clean_text") -> pd.DataFrame:
-		res = self.fit_transform(df[text_col].fillna("").astype(str).tolist())
-		df = df.copy()
-		df["topic"] = res["topic"].values
-		df["topic_prob"] = res["topic_prob"].values
-		return df
+		return df.assign(**self.predict_columns(df[text_col].fillna("").astype(str).tolist()))
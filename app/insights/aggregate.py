@@ -1,8 +1,11 @@
 from __future__ import annotations
-from collections import Counter
-from typing import Dict, List
+from typing import Dict, List, Tuple
+import functools
 import os
+import re
+import numpy as np
 import pandas as pd
+from sklearn.feature_extraction.text import HashingVectorizer
 from .business_insights import BusinessInsightsAnalyzer
 
 # Groq only
@@ -12,6 +15,79 @@ try:
 except Exception:
 	_groq_available = False
 
+# Common problem keywords to look for
+PROBLEM_KEYWORDS = {
+	'delivery': ['late', 'delayed', 'slow', 'delivery', 'shipping', 'arrived'],
+	'quality': ['broken', 'damaged', 'poor quality', 'defective', 'faulty', 'low quality'],
+	'service': ['rude', 'unhelpful', 'poor service', 'bad service', 'customer service'],
+	'website': ['confusing', 'difficult', 'hard to use', 'website', 'checkout', 'navigation'],
+	'pricing': ['expensive', 'overpriced', 'too expensive', 'cost', 'price'],
+	'product': ['missing', 'wrong', 'incorrect', 'not as described', 'product'],
+	'support': ['no response', 'slow response', 'support', 'help', 'assistance']
+}
+
+# Keywords used to count problem categories when generating insights
+INSIGHT_KEYWORDS = {
+	'delivery': ['late', 'delayed', 'delivery', 'shipping', 'arrived'],
+	'quality': ['broken', 'damaged', 'poor quality', 'defective', 'faulty'],
+	'service': ['rude', 'unhelpful', 'poor service', 'bad service'],
+	'website': ['confusing', 'website', 'checkout', 'navigation', 'difficult'],
+	'pricing': ['expensive', 'overpriced', 'cost', 'price'],
+	'product': [],
+	'support': []
+}
+
+# Keywords that mark which aspect a positive review praises
+POSITIVE_KEYWORDS = {
+	'service': ['great service', 'excellent service', 'helpful', 'friendly', 'support'],
+	'quality': ['quality', 'good quality', 'excellent quality', 'perfect'],
+	'delivery': ['fast', 'quick', 'delivery', 'shipping', 'on time'],
+	'website': ['easy', 'simple', 'website', 'user-friendly'],
+	'pricing': ['value', 'worth', 'affordable', 'price'],
+	'product': [],
+	'support': []
+}
+
+# Reuse LLM recommendations for prompt contexts at least this similar (cosine)
+SEMANTIC_CACHE_THRESHOLD = 0.87
+SEMANTIC_CACHE_SIZE = 128
+
+# Lightweight embedding used when sentence-transformers is unavailable
+_HASHER = HashingVectorizer(n_features=2 ** 12, alternate_sign=False, ngram_range=(1, 2), norm='l2')
+
+
+@functools.lru_cache(maxsize=1)
+def _get_embedder():
+	"""Sentence embedder for the recommendations cache, or None if unavailable."""
+	try:
+		from sentence_transformers import SentenceTransformer
+		return SentenceTransformer("all-MiniLM-L6-v2")
+	except Exception:
+		return None
+
+
+def _embed(text: str) -> np.ndarray:
+	"""Return a unit-length embedding of `text`."""
+	embedder = _get_embedder()
+	if embedder is not None:
+		return np.asarray(embedder.encode(text, normalize_embeddings=True), dtype=np.float32)
+	return _HASHER.transform([text]).toarray()[0].astype(np.float32)
+
+
+SENTENCE_SPLIT_PATTERN = re.compile(r"[.!?]+")
+
+
+def _keyword_pattern(keywords: List[str]) -> re.Pattern:
+	"""Compile keywords into one alternation regex (plain substring semantics)."""
+	return re.compile("|".join(re.escape(k) for k in keywords))
+
+
+# Keyword regexes compiled once at import and shared by every aggregator
+PROBLEM_PATTERNS = {cat: _keyword_pattern(kws) for cat, kws in PROBLEM_KEYWORDS.items()}
+ANY_PROBLEM_PATTERN = _keyword_pattern([kw for kws in PROBLEM_KEYWORDS.values() for kw in kws])
+INSIGHT_PATTERNS = {cat: _keyword_pattern(kws) for cat, kws in INSIGHT_KEYWORDS.items() if kws}
+POSITIVE_PATTERNS = {cat: _keyword_pattern(kws) for cat, kws in POSITIVE_KEYWORDS.items() if kws}
+
 
 class InsightAggregator:
 	def __init__(self, model: str | None = None):
@@ -19,80 +95,85 @@ class InsightAggregator:
 		self.use_groq = _groq_available and bool(os.getenv("GROQ_API_KEY"))
 		self._groq = Groq(api_key=os.getenv("GROQ_API_KEY")) if self.use_groq else None
 		self.business_analyzer = BusinessInsightsAnalyzer()
+		# Semantic cache of (context embedding, recommendations), most recently used last
+		self._cache: List[Tuple[np.ndarray, List[str]]] = []
+		self._problem_patterns = PROBLEM_PATTERNS
+		self._any_problem_pattern = ANY_PROBLEM_PATTERN
+		self._insight_patterns = INSIGHT_PATTERNS
+		self._positive_patterns = POSITIVE_PATTERNS
 
-	def _extract_problems_from_feedback(self, df: pd.DataFrame) -> List[str]:
+	@staticmethod
+	def _lowercase_feedback(df: pd.DataFrame) -> pd.Series:
+		"""Return the lowercased `feedback_text` column (empty strings if missing)."""
+		if '_ft_lower' in df.columns:
+			return df['_ft_lower']
+		return df.get('feedback_text', pd.Series('', index=df.index)).astype(str).str.lower()
+
+	@staticmethod
+	def _sentiment_masks(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+		"""Boolean row masks for each sentiment label, computed once per aggregate() call."""
+		labels = df['sentiment_label'] if 'sentiment_label' in df.columns else pd.Series('', index=df.index)
+		return {label: labels.eq(label).to_numpy() for label in ('NEGATIVE', 'POSITIVE', 'NEUTRAL')}
+
+	def _category_hits(self, texts: pd.Series) -> pd.DataFrame:
+		"""Boolean matrix of keyword hits per row, with (family, category) columns."""
+		families = (('insight', self._insight_patterns), ('positive', self._positive_patterns))
+		return pd.DataFrame(
+			{(family, cat): texts.str.contains(pattern, na=False) for family, patterns in families for cat, pattern in patterns.items()},
+			index=texts.index,
+		)
+
+	def _extract_problems_from_feedback(self, df: pd.DataFrame, masks: Dict[str, np.ndarray] | None = None) -> List[str]:
 		"""Extract and summarize actual problems mentioned in customer feedback."""
-		problems = []
-		negative_feedback = df[df.get('sentiment_label', '') == 'NEGATIVE']
+		if masks is None:
+			masks = self._sentiment_masks(df)
+		negative_mask = masks['NEGATIVE']
 		
-		if len(negative_feedback) == 0:
+		if not negative_mask.any():
 			return ["No specific problems identified in the feedback."]
 		
-		# Common problem keywords to look for
-		problem_keywords = {
-			'delivery': ['late', 'delayed', 'slow', 'delivery', 'shipping', 'arrived'],
-			'quality': ['broken', 'damaged', 'poor quality', 'defective', 'faulty', 'low quality'],
-			'service': ['rude', 'unhelpful', 'poor service', 'bad service', 'customer service'],
-			'website': ['confusing', 'difficult', 'hard to use', 'website', 'checkout', 'navigation'],
-			'pricing': ['expensive', 'overpriced', 'too expensive', 'cost', 'price'],
-			'product': ['missing', 'wrong', 'incorrect', 'not as described', 'product'],
-			'support': ['no response', 'slow response', 'support', 'help', 'assistance']
-		}
-		
-		# Analyze each negative feedback
-		for _, row in negative_feedback.iterrows():
-			feedback_text = str(row.get('feedback_text', '')).lower()
-			
-			# Check for specific problem categories
-			for category, keywords in problem_keywords.items():
-				if any(keyword in feedback_text for keyword in keywords):
-					# Extract the specific issue
-					for keyword in keywords:
-						if keyword in feedback_text:
-							# Find the sentence containing the keyword
-							sentences = feedback_text.split('.')
-							for sentence in sentences:
-								if keyword in sentence:
-									problem = sentence.strip()
-									if len(problem) > 10:  # Avoid very short fragments
-										problems.append(f"{category.title()} issue: {problem}")
-									break
-							break
+		# Split every negative row into sentences in a single pass
+		texts = self._lowercase_feedback(df)[negative_mask].reset_index(drop=True)
+		sentences = texts.str.split(SENTENCE_SPLIT_PATTERN).explode()
+		# Only sentences mentioning some problem keyword can match a category
+		sentences = sentences[sentences.str.contains(self._any_problem_pattern, na=False)]
+		
+		# For each category, keep the first sentence per row that mentions one of its keywords
+		found = []
+		for cat_idx, (category, pattern) in enumerate(self._problem_patterns.items()):
+			hits = sentences[sentences.str.contains(pattern, na=False)]
+			first = hits[~hits.index.duplicated()].str.strip()
+			first = first[first.str.len() > 10]  # Avoid very short fragments
+			found.append(pd.DataFrame({
+				'row': first.index,
+				'cat': cat_idx,
+				'problem': f"{category.title()} issue: " + first,
+			}))
+		
+		# Report problems row by row, in category order within a row
+		problems = pd.concat(found).sort_values(['row', 'cat'], kind='stable')['problem']
 		
 		# Remove duplicates and limit to top issues
-		unique_problems = list(dict.fromkeys(problems))  # Remove duplicates while preserving order
-		return unique_problems[:5]  # Return top 5 problems
+		return problems.drop_duplicates().head(5).tolist()  # Return top 5 problems
 
-	def _analyze_positive_feedback(self, df: pd.DataFrame) -> List[str]:
+	def _analyze_positive_feedback(self, df: pd.DataFrame, cat_hits: pd.DataFrame | None = None, masks: Dict[str, np.ndarray] | None = None) -> List[str]:
 		"""Analyze positive feedback for business insights."""
 		insights = []
-		positive_feedback = df[df.get('sentiment_label', '') == 'POSITIVE']
+		if masks is None:
+			masks = self._sentiment_masks(df)
+		positive_mask = masks['POSITIVE']
+		total_positive = int(positive_mask.sum())
 		
-		if len(positive_feedback) == 0:
+		if total_positive == 0:
 			return insights
 		
-		# Count positive aspects
-		positive_aspects = {
-			'service': 0, 'quality': 0, 'delivery': 0, 'website': 0, 
-			'pricing': 0, 'product': 0, 'support': 0
-		}
-		
-		for _, row in positive_feedback.iterrows():
-			feedback_text = str(row.get('feedback_text', '')).lower()
-			
-			if any(word in feedback_text for word in ['great service', 'excellent service', 'helpful', 'friendly', 'support']):
-				positive_aspects['service'] += 1
-			if any(word in feedback_text for word in ['quality', 'good quality', 'excellent quality', 'perfect']):
-				positive_aspects['quality'] += 1
-			if any(word in feedback_text for word in ['fast', 'quick', 'delivery', 'shipping', 'on time']):
-				positive_aspects['delivery'] += 1
-			if any(word in feedback_text for word in ['easy', 'simple', 'website', 'user-friendly']):
-				positive_aspects['website'] += 1
-			if any(word in feedback_text for word in ['value', 'worth', 'affordable', 'price']):
-				positive_aspects['pricing'] += 1
+		# Count positive aspects from the precomputed keyword hits
+		if cat_hits is None:
+			cat_hits = self._category_hits(self._lowercase_feedback(df))
+		hits = cat_hits['positive'][positive_mask]
+		positive_aspects = {cat: int(hits[cat].sum()) if cat in hits else 0 for cat in POSITIVE_KEYWORDS}
 		
 		# Generate positive insights
-		total_positive = len(positive_feedback)
 		top_strength = max(positive_aspects.items(), key=lambda x: x[1])
 		if top_strength[1] > 0:
 			percentage = round((top_strength[1] / total_positive) * 100, 1)
@@ -105,48 +186,29 @@ class InsightAggregator:
 		
 		return insights
 
-	def _generate_insights_from_feedback(self, df: pd.DataFrame) -> List[str]:
+	def _generate_insights_from_feedback(self, df: pd.DataFrame, cat_hits: pd.DataFrame | None = None, masks: Dict[str, np.ndarray] | None = None) -> List[str]:
 		"""Generate comprehensive business insights from customer feedback patterns."""
 		insights = []
 		
 		# Analyze sentiment patterns
-		negative_feedback = df[df.get('sentiment_label', '') == 'NEGATIVE']
-		positive_feedback = df[df.get('sentiment_label', '') == 'POSITIVE']
-		neutral_feedback = df[df.get('sentiment_label', '') == 'NEUTRAL']
-		
-		# Count problem categories with detailed analysis
-		problem_categories = {
-			'delivery': {'count': 0, 'issues': []}, 
-			'quality': {'count': 0, 'issues': []}, 
-			'service': {'count': 0, 'issues': []}, 
-			'website': {'count': 0, 'issues': []}, 
-			'pricing': {'count': 0, 'issues': []}, 
-			'product': {'count': 0, 'issues': []}, 
-			'support': {'count': 0, 'issues': []}
-		}
-		
-		# Analyze negative feedback for detailed patterns
-		for _, row in negative_feedback.iterrows():
-			feedback_text = str(row.get('feedback_text', '')).lower()
-			
-			if any(word in feedback_text for word in ['late', 'delayed', 'delivery', 'shipping', 'arrived']):
-				problem_categories['delivery']['count'] += 1
-				problem_categories['delivery']['issues'].append(feedback_text[:50])
-			if any(word in feedback_text for word in ['broken', 'damaged', 'poor quality', 'defective', 'faulty']):
-				problem_categories['quality']['count'] += 1
-				problem_categories['quality']['issues'].append(feedback_text[:50])
-			if any(word in feedback_text for word in ['rude', 'unhelpful', 'poor service', 'bad service']):
-				problem_categories['service']['count'] += 1
-				problem_categories['service']['issues'].append(feedback_text[:50])
-			if any(word in feedback_text for word in ['confusing', 'website', 'checkout', 'navigation', 'difficult']):
-				problem_categories['website']['count'] += 1
-				problem_categories['website']['issues'].append(feedback_text[:50])
-			if any(word in feedback_text for word in ['expensive', 'overpriced', 'cost', 'price']):
-				problem_categories['pricing']['count'] += 1
-				problem_categories['pricing']['issues'].append(feedback_text[:50])
+		if masks is None:
+			masks = self._sentiment_masks(df)
+		negative_mask = masks['NEGATIVE']
+		
+		# Count problem categories with detailed analysis from the precomputed keyword hits
+		texts = self._lowercase_feedback(df)
+		if cat_hits is None:
+			cat_hits = self._category_hits(texts)
+		problem_categories = {cat: {'count': 0, 'issues': []} for cat in INSIGHT_KEYWORDS}
+		hits = cat_hits['insight'][negative_mask]
+		lower = texts[negative_mask]
+		for category in self._insight_patterns:
+			mask = hits[category]
+			problem_categories[category]['count'] = int(mask.sum())
+			problem_categories[category]['issues'] = lower[mask].str.slice(0, 50).tolist()
 		
 		# Generate detailed insights based on patterns
-		total_negative = len(negative_feedback)
+		total_negative = int(negative_mask.sum())
 		total_feedback = len(df)
 		
 		if total_negative > 0:
@@ -177,26 +239,29 @@ class InsightAggregator:
 						insights.append(f"Pricing Concerns: {data['count']} pricing complaints ({percentage}% of feedback) - review pricing strategy and value communication")
 		
 		# Add positive feedback insights
-		positive_insights = self._analyze_positive_feedback(df)
+		positive_insights = self._analyze_positive_feedback(df, cat_hits=cat_hits, masks=masks)
 		insights.extend(positive_insights)
 		
 		# Neutral feedback opportunity
-		if len(neutral_feedback) > 0:
-			neutral_pct = round((len(neutral_feedback) / total_feedback) * 100, 1)
+		total_neutral = int(masks['NEUTRAL'].sum())
+		if total_neutral > 0:
+			neutral_pct = round((total_neutral / total_feedback) * 100, 1)
 			insights.append(f"Growth Opportunity: {neutral_pct}% neutral feedback - implement strategies to convert neutral customers to advocates")
 		
 		return insights[:6]  # Return top 6 insights
 
-	def _generate_business_impact_analysis(self, df: pd.DataFrame) -> List[str]:
+	def _generate_business_impact_analysis(self, df: pd.DataFrame, masks: Dict[str, np.ndarray] | None = None) -> List[str]:
 		"""Generate detailed business impact analysis for executives."""
 		analysis = []
 		total_feedback = len(df)
-		negative_feedback = df[df.get('sentiment_label', '') == 'NEGATIVE']
-		positive_feedback = df[df.get('sentiment_label', '') == 'POSITIVE']
+		if masks is None:
+			masks = self._sentiment_masks(df)
+		total_negative = int(masks['NEGATIVE'].sum())
+		total_positive = int(masks['POSITIVE'].sum())
 		
 		# Customer satisfaction metrics
-		csat_score = round((len(positive_feedback) / total_feedback) * 100, 1) if total_feedback > 0 else 0
-		negative_rate = round((len(negative_feedback) / total_feedback) * 100, 1) if total_feedback > 0 else 0
+		csat_score = round((total_positive / total_feedback) * 100, 1) if total_feedback > 0 else 0
+		negative_rate = round((total_negative / total_feedback) * 100, 1) if total_feedback > 0 else 0
 		
 		analysis.append(f"Customer Satisfaction Score: {csat_score}% (Industry benchmark: 80%+)")
 		analysis.append(f"Customer Dissatisfaction Rate: {negative_rate}% (Critical threshold: >20%)")
@@ -214,35 +279,37 @@ class InsightAggregator:
 		
 		return analysis
 
-	def _generate_strategic_recommendations(self, df: pd.DataFrame) -> List[str]:
+	def _generate_strategic_recommendations(self, df: pd.DataFrame, masks: Dict[str, np.ndarray] | None = None) -> List[str]:
 		"""Generate strategic business recommendations with specific actions."""
 		recommendations = []
-		negative_feedback = df[df.get('sentiment_label', '') == 'NEGATIVE']
-		positive_feedback = df[df.get('sentiment_label', '') == 'POSITIVE']
+		if masks is None:
+			masks = self._sentiment_masks(df)
+		has_negative = bool(masks['NEGATIVE'].any())
+		has_positive = bool(masks['POSITIVE'].any())
 		
 		# Immediate actions (0-30 days)
 		immediate_actions = []
-		if len(negative_feedback) > 0:
+		if has_negative:
 			immediate_actions.append("IMMEDIATE (0-30 days): Implement 24-hour response protocol for all negative feedback")
 			immediate_actions.append("IMMEDIATE (0-30 days): Create escalation matrix for critical issues requiring management intervention")
 		
 		# Short-term actions (1-3 months)
 		short_term_actions = []
-		if len(negative_feedback) > 0:
+		if has_negative:
 			short_term_actions.append("SHORT-TERM (1-3 months): Deploy customer feedback analytics dashboard for real-time monitoring")
 			short_term_actions.append("SHORT-TERM (1-3 months): Establish cross-functional customer experience improvement team")
 		
 		# Long-term strategic initiatives (3-12 months)
 		long_term_actions = []
-		if len(negative_feedback) > 0:
+		if has_negative:
 			long_term_actions.append("LONG-TERM (3-12 months): Implement predictive customer satisfaction modeling")
 			long_term_actions.append("LONG-TERM (3-12 months): Develop customer success program to proactively address issues")
 		
 		# ROI-focused recommendations
 		roi_recommendations = []
-		if len(positive_feedback) > 0:
+		if has_positive:
 			roi_recommendations.append("ROI OPPORTUNITY: Leverage positive feedback for marketing campaigns and case studies")
-		if len(negative_feedback) > 0:
+		if has_negative:
 			roi_recommendations.append("ROI IMPACT: Each resolved complaint can prevent 3-5 negative reviews and potential customer loss")
 		
 		recommendations.extend(immediate_actions[:2])
@@ -252,20 +319,20 @@ class InsightAggregator:
 		
 		return recommendations
 
-	def _recommendations_fallback(self, summary_lines: List[str], sentiment_breakdown: Dict, topic_counts: Dict, df: pd.DataFrame) -> List[str]:
+	def _recommendations_fallback(self, summary_lines: List[str], sentiment_breakdown: Dict, topic_counts: Dict, df: pd.DataFrame, cat_hits: pd.DataFrame | None = None, masks: Dict[str, np.ndarray] | None = None) -> List[str]:
 		"""Generate comprehensive business insights and strategic recommendations."""
 		recommendations = []
 		
 		# Generate detailed business impact analysis
-		business_impact = self._generate_business_impact_analysis(df)
+		business_impact = self._generate_business_impact_analysis(df, masks=masks)
 		recommendations.extend(business_impact)
 		
 		# Generate insights from feedback patterns
-		insights = self._generate_insights_from_feedback(df)
+		insights = self._generate_insights_from_feedback(df, cat_hits=cat_hits, masks=masks)
 		recommendations.extend(insights[:3])  # Top 3 insights
 		
 		# Generate strategic recommendations
-		strategic_recs = self._generate_strategic_recommendations(df)
+		strategic_recs = self._generate_strategic_recommendations(df, masks=masks)
 		recommendations.extend(strategic_recs[:4])  # Top 4 strategic recommendations
 		
 		# Fallback if no recommendations generated
@@ -279,14 +346,29 @@ class InsightAggregator:
 		
 		return recommendations[:8]  # Return top 8 comprehensive recommendations
 
-	def _recommendations_llm(self, summary_lines: List[str], df: pd.DataFrame) -> List[str]:
+	def _cache_lookup(self, key: np.ndarray) -> List[str] | None:
+		"""Return cached recommendations for a similar context, refreshing its LRU position."""
+		if not self._cache:
+			return None
+		sims = np.stack([k for k, _ in self._cache]) @ key
+		best = int(sims.argmax())
+		if sims[best] <= SEMANTIC_CACHE_THRESHOLD:
+			return None
+		entry = self._cache.pop(best)
+		self._cache.append(entry)
+		return entry[1]
+
+	def _cache_store(self, key: np.ndarray, lines: List[str]) -> None:
+		self._cache.append((key, lines))
+		if len(self._cache) > SEMANTIC_CACHE_SIZE:
+			self._cache.pop(0)
+
+	def _recommendations_llm(self, summary_lines: List[str], df: pd.DataFrame, masks: Dict[str, np.ndarray] | None = None) -> List[str]:
 		# Extract sample negative feedback for context
-		negative_feedback = df[df.get('sentiment_label', '') == 'NEGATIVE']
-		sample_problems = []
-		if len(negative_feedback) > 0:
-			for _, row in negative_feedback.head(3).iterrows():
-				feedback = str(row.get('feedback_text', ''))[:100]  # First 100 chars
-				sample_problems.append(feedback)
+		if masks is None:
+			masks = self._sentiment_masks(df)
+		feedback = df['feedback_text'] if 'feedback_text' in df.columns else pd.Series('', index=df.index)
+		sample_problems = feedback[masks['NEGATIVE']].head(3).astype(str).str[:100].tolist()  # First 100 chars
 		
 		prompt = (
 			"Analyze these customer feedback patterns and provide 3 strategic business insights and recommendations. "
@@ -297,7 +379,13 @@ class InsightAggregator:
 			"1. Business process improvements\n2. Operational changes needed\n3. Strategic initiatives to address root causes"
 		)
 		text = None
+		cache_key = None
 		if self._groq is not None:
+			# Similar findings and samples get the same advice; skip the round-trip
+			cache_key = _embed("\n".join(summary_lines + sample_problems))
+			cached = self._cache_lookup(cache_key)
+			if cached is not None:
+				return cached
 			try:
 				resp = self._groq.chat.completions.create(
 					model=self.groq_model,
@@ -313,18 +401,23 @@ class InsightAggregator:
 		if not text:
 			return self._recommendations_fallback(summary_lines)
 		lines = [l.strip("- ") for l in text.splitlines() if l.strip()]
+		if lines and cache_key is not None:
+			self._cache_store(cache_key, lines[:3])
 		return lines[:3] if lines else self._recommendations_fallback(summary_lines)
 
 	def aggregate(self, df: pd.DataFrame) -> Dict:
 		total = max(len(df), 1)
-		# Sentiment breakdown
-		sentiments = Counter(df.get("sentiment_label", []))
+		# Lowercase feedback and scan keyword families once, shared by the helpers below
+		df = df.assign(_ft_lower=self._lowercase_feedback(df))
+		cat_hits = self._category_hits(df['_ft_lower'])
+		masks = self._sentiment_masks(df)
+		# Sentiment breakdown (counts in first-appearance order)
+		sentiments = df['sentiment_label'].value_counts(sort=False, dropna=False).to_dict() if 'sentiment_label' in df.columns else {}
 		sentiment_breakdown = {k: round(v / total * 100, 1) for k, v in sentiments.items()}
 		# Topic counts
-		topic_counts = Counter(df.get("topic", []))
+		topic_counts = df['topic'].value_counts(sort=False, dropna=False).to_dict() if 'topic' in df.columns else {}
 		# Top findings summary lines
 		top_sent = ", ".join([f"{k}: {v}%" for k, v in sorted(sentiment_breakdown.items(), key=lambda x: -x[1])])
-		common_topics = ", ".join([f"Topic {t} ({c} mentions)" for t, c in topic_counts.most_common(3)])
 		
 		# Enhanced business-focused findings
 		summary_lines = [
@@ -363,9 +456,9 @@ class InsightAggregator:
 		
 		# Try LLM recommendations first, fallback to data-driven recommendations
 		try:
-			recommendations = self._recommendations_llm(summary_lines, df)
+			recommendations = self._recommendations_llm(summary_lines, df, masks=masks)
 		except Exception:
-			recommendations = self._recommendations_fallback(summary_lines, sentiment_breakdown, dict(topic_counts), df)
+			recommendations = self._recommendations_fallback(summary_lines, sentiment_breakdown, topic_counts, df, cat_hits=cat_hits, masks=masks)
 
 		# Add business-specific recommendations
 		business_recommendations = problem_analysis.get('recommendations', [])
@@ -373,7 +466,7 @@ class InsightAggregator:
 		
 		return {
 			"sentiment_breakdown": sentiment_breakdown,
-			"topic_counts": dict(topic_counts),
+			"topic_counts": topic_counts,
 			"top_findings": summary_lines,
 			"recommendations": enhanced_recommendations,
 			"business_insights": {
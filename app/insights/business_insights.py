@@ -4,14 +4,102 @@ Provides comprehensive business analysis with specific problem identification,
 solutions, and visual data analysis for customer feedback.
 """
 
+import functools
+import re
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Tuple, Any
+from typing import Dict, List, Tuple, Any, Callable, NamedTuple
 from collections import Counter, defaultdict
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
+try:
+    import ahocorasick
+    _ahocorasick_available = True
+    # Builds compiled without unicode support match raw bytes keys instead of str
+    _ahocorasick_bytes = not getattr(ahocorasick, 'unicode', True)
+except Exception:
+    ahocorasick = None
+    _ahocorasick_available = False
+    _ahocorasick_bytes = False
+
+try:
+    from numba import njit
+    _numba_available = True
+except Exception:
+    _numba_available = False
+
+    def njit(*args, **kwargs):
+        """Stand-in decorator so the kernels run as plain Python without numba."""
+        if args and callable(args[0]):
+            return args[0]
+        return lambda fn: fn
+
+
+# Integer severity codes, ordered so a larger code is more severe
+SEVERITY_LABELS = ('LOW', 'MEDIUM', 'HIGH', 'CRITICAL')
+SEVERITY_CODES = {label: code for code, label in enumerate(SEVERITY_LABELS)}
+SEVERITY_TIMELINES = ('1-2 months', '2-4 weeks', '1-2 weeks', '0-7 days')
+# Example feedback entries kept per problem category
+SAMPLE_FEEDBACK_LIMIT = 3
+BASE_ROI = {
+    'delivery': 25, 'quality': 30, 'service': 35,
+    'website': 40, 'pricing': 20, 'product': 25, 'support': 30
+}
+
+
+def _severity_codes(percentages, counts) -> np.ndarray:
+    """Severity code per category from its share of negative feedback and its count."""
+    percentages = np.asarray(percentages)
+    counts = np.asarray(counts)
+    return np.select(
+        [
+            (percentages >= 30) | (counts >= 10),
+            (percentages >= 15) | (counts >= 5),
+            (percentages >= 5) | (counts >= 2),
+        ],
+        [3, 2, 1],
+        default=0,
+    ).astype(np.int8)
+
+
+@njit(cache=True)
+def _category_stats_kernel(hits, scores):
+    """Single pass over the hit matrix: per-category counts and mean score of the matching rows."""
+    n_rows, n_cats = hits.shape
+    counts = np.zeros(n_cats, dtype=np.int64)
+    score_sums = np.zeros(n_cats, dtype=np.float64)
+    for i in range(n_rows):
+        for j in range(n_cats):
+            if hits[i, j]:
+                counts[j] += 1
+                score_sums[j] += scores[i]
+    mean_scores = np.zeros(n_cats, dtype=np.float64)
+    for j in range(n_cats):
+        if counts[j] > 0:
+            mean_scores[j] = score_sums[j] / counts[j]
+    return counts, mean_scores
+
+
+def _category_stats(hits: np.ndarray, scores: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-category hit counts and mean sentiment scores for a (rows, categories) hit matrix."""
+    if _numba_available:
+        return _category_stats_kernel(hits, scores)
+    # Without numba the row loop would run in Python; column reductions stay in C
+    counts = hits.sum(axis=0, dtype=np.int64)
+    mean_scores = np.divide(scores @ hits, counts, out=np.zeros(len(counts)), where=counts > 0)
+    return counts, mean_scores
+
+
+class ProblemTotals(NamedTuple):
+    """Aggregates over problem_analysis, gathered in a single pass."""
+    total_problems: int
+    critical_count: int
+    high_count: int
+    critical_categories: List[str]
+    high_categories: List[str]
+
 
 class BusinessInsightsAnalyzer:
     """Comprehensive business insights analyzer for customer feedback."""
@@ -89,100 +177,182 @@ class BusinessInsightsAnalyzer:
                 ]
             }
         }
+        # Flat keyword -> category-index layout, so scanning never walks the nested config
+        self._cat_names = list(self.problem_categories)
+        self._kw_to_cat_idx = self._build_keyword_index()
+        self._automaton = self._build_automaton() if _ahocorasick_available else None
+        # Without Aho-Corasick, one precompiled alternation per category stops at the first hit
+        self._cat_regex = None if self._automaton is not None else [
+            re.compile('|'.join(re.escape(keyword) for keyword in self.problem_categories[category]['keywords']))
+            for category in self._cat_names
+        ]
+    
+    def _build_keyword_index(self) -> Dict[str, np.ndarray]:
+        """Map every keyword to the array of category indices it marks.
+        
+        A keyword can belong to several categories ('slow', 'defective').
+        """
+        keyword_categories = defaultdict(list)
+        for cat_idx, category in enumerate(self._cat_names):
+            for keyword in self.problem_categories[category]['keywords']:
+                keyword_categories[keyword].append(cat_idx)
+        return {keyword: np.array(cat_ids, dtype=np.int8) for keyword, cat_ids in keyword_categories.items()}
+    
+    def _build_automaton(self):
+        """Build one Aho-Corasick automaton over every category keyword."""
+        automaton = ahocorasick.Automaton()
+        for keyword, cat_ids in self._kw_to_cat_idx.items():
+            automaton.add_word(keyword.encode('ascii') if _ahocorasick_bytes else keyword, cat_ids)
+        automaton.make_automaton()
+        return automaton
+    
+    def _category_matches(self, texts: pd.Series) -> Tuple[np.ndarray, List[List[int]]]:
+        """Boolean (rows, categories) matrix of keyword hits for lowercased texts.
+        
+        Also returns up to SAMPLE_FEEDBACK_LIMIT matching row positions per category.
+        """
+        if self._automaton is None:
+            hits = np.column_stack([
+                texts.str.contains(pattern, na=False).to_numpy()
+                for pattern in self._cat_regex
+            ])
+            return hits, [np.flatnonzero(column)[:SAMPLE_FEEDBACK_LIMIT].tolist() for column in hits.T]
+        # Single linear pass per text over all categories at once; samples stop growing once full
+        hits = np.zeros((len(texts), len(self._cat_names)), dtype=bool)
+        samples = [[] for _ in self._cat_names]
+        open_samples = set(range(len(self._cat_names)))
+        # Keywords are ASCII, so their UTF-8 bytes match the encoded text exactly
+        rows = (texts.str.encode('utf-8', errors='ignore') if _ahocorasick_bytes else texts).tolist()
+        for row, text in enumerate(rows):
+            for _, cat_ids in self._automaton.iter(text):
+                hits[row, cat_ids] = True
+            if open_samples:
+                for cat_idx in open_samples.intersection(np.flatnonzero(hits[row]).tolist()):
+                    samples[cat_idx].append(row)
+                    if len(samples[cat_idx]) == SAMPLE_FEEDBACK_LIMIT:
+                        open_samples.discard(cat_idx)
+        return hits, samples
     
     def analyze_problems(self, df: pd.DataFrame) -> Dict[str, Any]:
         """Analyze customer problems with detailed categorization and business impact."""
-        negative_feedback = df[df.get('sentiment_label', '') == 'NEGATIVE']
+        labels = df['sentiment_label'] if 'sentiment_label' in df.columns else pd.Series('', index=df.index)
+        negative_mask = labels.eq('NEGATIVE')
+        total_negative = int(negative_mask.sum())
         
-        if len(negative_feedback) == 0:
+        if total_negative == 0:
             return {
                 'problem_summary': 'No negative feedback identified',
                 'problem_categories': {},
                 'business_impact': 'No immediate business risks identified',
-                'recommendations': ['Continue monitoring customer feedback for early issue detection']
+                'recommendations': ['Continue monitoring customer feedback for early issue detection'],
+                'sorted_categories': []
             }
         
         # Analyze each problem category
         problem_analysis = {}
-        total_negative = len(negative_feedback)
+        negative_feedback = df.loc[negative_mask]
         
-        for category, config in self.problem_categories.items():
-            category_feedback = []
-            category_count = 0
-            
-            for _, row in negative_feedback.iterrows():
-                feedback_text = str(row.get('feedback_text', '')).lower()
-                
-                # Check if any keywords match
-                if any(keyword in feedback_text for keyword in config['keywords']):
-                    category_count += 1
-                    category_feedback.append({
-                        'feedback': feedback_text[:100] + '...' if len(feedback_text) > 100 else feedback_text,
-                        'sentiment_score': row.get('sentiment_score', 0)
-                    })
+        # Lowercase the feedback and look up scores once for all categories
+        texts = negative_feedback.get('feedback_text', pd.Series('', index=negative_feedback.index)).astype(str).str.lower()
+        scores = negative_feedback.get('sentiment_score', pd.Series(0, index=negative_feedback.index))
+        
+        # Per-category counts come from one column sum over the hit matrix; arrays are
+        # allocated per call so a shared analyzer stays safe across threads
+        matches, sample_rows = self._category_matches(texts)
+        score_values = pd.to_numeric(scores, errors='coerce').fillna(0).to_numpy(dtype=np.float64)
+        category_counts, mean_scores = _category_stats(matches, score_values)
+        percentages = np.array([round((int(count) / total_negative) * 100, 1) for count in category_counts])
+        severities = _severity_codes(percentages, category_counts)
+        
+        for cat_idx, category in enumerate(self._cat_names):
+            config = self.problem_categories[category]
+            category_count = int(category_counts[cat_idx])
             
             if category_count > 0:
-                percentage = round((category_count / total_negative) * 100, 1)
+                rows = sample_rows[cat_idx]
+                category_feedback = [
+                    {
+                        'feedback': feedback_text[:100] + '...' if len(feedback_text) > 100 else feedback_text,
+                        'sentiment_score': score
+                    }
+                    for feedback_text, score in zip(texts.iloc[rows], scores.iloc[rows])
+                ]
+                percentage = float(percentages[cat_idx])
                 problem_analysis[category] = {
                     'count': category_count,
                     'percentage': percentage,
                     'business_impact': config['business_impact'],
                     'solutions': config['solutions'],
-                    'sample_feedback': category_feedback[:3],  # Top 3 examples
-                    'severity': self._calculate_severity(percentage, category_count)
+                    'sample_feedback': category_feedback,  # Top 3 examples
+                    'avg_sentiment_score': round(float(mean_scores[cat_idx]), 3),
+                    'severity': SEVERITY_LABELS[severities[cat_idx]],
+                    'sev_rank': int(severities[cat_idx])  # SEVERITY_CODES value, for integer sort keys
                 }
         
+        totals = self._problem_totals(problem_analysis)
+        sorted_categories = self._sort_by_priority(problem_analysis)
         return {
-            'problem_summary': self._generate_problem_summary(problem_analysis, total_negative),
+            'problem_summary': self._generate_problem_summary(problem_analysis, total_negative, totals),
             'problem_categories': problem_analysis,
-            'business_impact': self._calculate_business_impact(problem_analysis, total_negative),
-            'recommendations': self._generate_specific_recommendations(problem_analysis)
+            'business_impact': self._calculate_business_impact(problem_analysis, total_negative, totals),
+            'recommendations': self._generate_specific_recommendations(problem_analysis, sorted_categories),
+            'sorted_categories': sorted_categories  # (category, data) pairs, most severe first
         }
     
     def _calculate_severity(self, percentage: float, count: int) -> str:
         """Calculate problem severity based on percentage and count."""
-        if percentage >= 30 or count >= 10:
-            return 'CRITICAL'
-        elif percentage >= 15 or count >= 5:
-            return 'HIGH'
-        elif percentage >= 5 or count >= 2:
-            return 'MEDIUM'
-        else:
-            return 'LOW'
+        return SEVERITY_LABELS[_severity_codes([percentage], [count])[0]]
+    
+    @staticmethod
+    def _problem_totals(problem_analysis: Dict) -> ProblemTotals:
+        """Collect problem counts and severity groups in one pass over the categories."""
+        total_problems = 0
+        critical_categories = []
+        high_categories = []
+        for category, cat in problem_analysis.items():
+            total_problems += cat['count']
+            if cat['severity'] == 'CRITICAL':
+                critical_categories.append(category)
+            elif cat['severity'] == 'HIGH':
+                high_categories.append(category)
+        return ProblemTotals(total_problems, len(critical_categories), len(high_categories), critical_categories, high_categories)
     
-    def _generate_problem_summary(self, problem_analysis: Dict, total_negative: int) -> str:
+    def _generate_problem_summary(self, problem_analysis: Dict, total_negative: int, totals: ProblemTotals | None = None) -> str:
         """Generate comprehensive problem summary."""
         if not problem_analysis:
             return "No specific problems identified in negative feedback."
         
-        total_problems = sum(cat['count'] for cat in problem_analysis.values())
-        critical_issues = [cat for cat in problem_analysis.values() if cat['severity'] == 'CRITICAL']
-        high_issues = [cat for cat in problem_analysis.values() if cat['severity'] == 'HIGH']
+        if totals is None:
+            totals = self._problem_totals(problem_analysis)
+        total_problems = totals.total_problems
         
         summary_parts = []
         
-        if critical_issues:
-            top_critical = max(critical_issues, key=lambda x: x['percentage'])
-            summary_parts.append(f"CRITICAL: {top_critical['percentage']}% of dissatisfied customers face {list(problem_analysis.keys())[list(problem_analysis.values()).index(top_critical)]} issues")
+        if totals.critical_categories:
+            # Track the category key with the max instead of searching values for it afterwards
+            top_key = max(totals.critical_categories, key=lambda category: problem_analysis[category]['percentage'])
+            summary_parts.append(f"CRITICAL: {problem_analysis[top_key]['percentage']}% of dissatisfied customers face {top_key} issues")
         
-        if high_issues:
-            summary_parts.append(f"HIGH PRIORITY: {len(high_issues)} problem categories require immediate attention")
+        if totals.high_categories:
+            summary_parts.append(f"HIGH PRIORITY: {totals.high_count} problem categories require immediate attention")
         
         summary_parts.append(f"TOTAL IMPACT: {total_problems} problem instances across {len(problem_analysis)} categories affecting {total_negative} dissatisfied customers")
         
         return " | ".join(summary_parts)
     
-    def _calculate_business_impact(self, problem_analysis: Dict, total_negative: int) -> Dict[str, Any]:
+    def _calculate_business_impact(self, problem_analysis: Dict, total_negative: int, totals: ProblemTotals | None = None) -> Dict[str, Any]:
         """Calculate detailed business impact metrics."""
         if not problem_analysis:
             return {'risk_level': 'LOW', 'estimated_churn': 0, 'revenue_impact': 'Minimal'}
         
         # Calculate risk metrics
-        critical_count = sum(1 for cat in problem_analysis.values() if cat['severity'] == 'CRITICAL')
-        high_count = sum(1 for cat in problem_analysis.values() if cat['severity'] == 'HIGH')
+        if totals is None:
+            totals = self._problem_totals(problem_analysis)
+        critical_count = totals.critical_count
+        high_count = totals.high_count
         
         # Estimate churn risk
-        total_problems = sum(cat['count'] for cat in problem_analysis.values())
+        total_problems = totals.total_problems
         estimated_churn = min(round((total_problems / total_negative) * 30, 1), 50)  # Max 50% churn risk
         
         # Determine risk level
@@ -199,7 +369,7 @@ class BusinessInsightsAnalyzer:
             'risk_level': risk_level,
             'estimated_churn': estimated_churn,
             'revenue_impact': self._calculate_revenue_impact(risk_level, estimated_churn),
-            'customer_satisfaction_impact': self._calculate_csat_impact(problem_analysis),
+            'customer_satisfaction_impact': self._calculate_csat_impact(problem_analysis, totals),
             'brand_reputation_risk': 'HIGH' if critical_count > 0 else 'MEDIUM' if high_count > 0 else 'LOW'
         }
     
@@ -214,12 +384,14 @@ class BusinessInsightsAnalyzer:
         else:
             return f"LOW: Estimated {estimated_churn}% revenue loss risk - monitor and maintain"
     
-    def _calculate_csat_impact(self, problem_analysis: Dict) -> str:
+    def _calculate_csat_impact(self, problem_analysis: Dict, totals: ProblemTotals | None = None) -> str:
         """Calculate customer satisfaction impact."""
         if not problem_analysis:
             return "No significant CSAT impact identified"
         
-        total_affected = sum(cat['count'] for cat in problem_analysis.values())
+        if totals is None:
+            totals = self._problem_totals(problem_analysis)
+        total_affected = totals.total_problems
         if total_affected >= 10:
             return "SIGNIFICANT: Multiple problem categories affecting customer satisfaction"
         elif total_affected >= 5:
@@ -227,16 +399,22 @@ class BusinessInsightsAnalyzer:
         else:
             return "MINOR: Limited problem areas with manageable CSAT impact"
     
-    def _generate_specific_recommendations(self, problem_analysis: Dict) -> List[Dict[str, Any]]:
+    @staticmethod
+    def _sort_by_priority(problem_analysis: Dict) -> List[Tuple[str, Dict]]:
+        """Categories ordered by severity rank (CRITICAL first, not alphabetical label order) and impact."""
+        return sorted(
+            problem_analysis.items(), 
+            key=lambda x: (x[1]['sev_rank'], x[1]['percentage']), 
+            reverse=True
+        )
+    
+    def _generate_specific_recommendations(self, problem_analysis: Dict, sorted_problems: List[Tuple[str, Dict]] | None = None) -> List[Dict[str, Any]]:
         """Generate specific, actionable recommendations for each problem category."""
         recommendations = []
         
         # Sort by severity and impact
-        sorted_problems = sorted(
-            problem_analysis.items(), 
-            key=lambda x: (x[1]['severity'], x[1]['percentage']), 
-            reverse=True
-        )
+        if sorted_problems is None:
+            sorted_problems = self._sort_by_priority(problem_analysis)
         
         for category, data in sorted_problems:
             rec = {
@@ -256,139 +434,139 @@ class BusinessInsightsAnalyzer:
     
     def _get_timeline(self, severity: str) -> str:
         """Get recommended timeline based on severity."""
-        timelines = {
-            'CRITICAL': '0-7 days',
-            'HIGH': '1-2 weeks',
-            'MEDIUM': '2-4 weeks',
-            'LOW': '1-2 months'
-        }
-        return timelines.get(severity, '2-4 weeks')
+        code = SEVERITY_CODES.get(severity)
+        return SEVERITY_TIMELINES[code] if code is not None else '2-4 weeks'
     
     def _calculate_roi_estimate(self, category: str, percentage: float) -> str:
         """Calculate ROI estimate for addressing the problem."""
-        base_roi = {
-            'delivery': 25, 'quality': 30, 'service': 35, 
-            'website': 40, 'pricing': 20, 'product': 25, 'support': 30
-        }
-        
         roi_multiplier = min(percentage / 10, 3)  # Scale with problem severity
-        estimated_roi = base_roi.get(category, 25) * roi_multiplier
+        estimated_roi = BASE_ROI.get(category, 25) * roi_multiplier
         
         return f"Estimated {estimated_roi:.0f}% ROI within 6 months"
     
-    def create_visualizations(self, df: pd.DataFrame, problem_analysis: Dict) -> Dict[str, Any]:
-        """Create comprehensive visualizations for business insights."""
+    def create_visualizations(self, df: pd.DataFrame, problem_analysis: Dict) -> Dict[str, Callable[[], go.Figure]]:
+        """Return zero-argument builders for the business insight charts.
+        
+        Plotly figures are costly to construct, so each one is only built when the
+        caller invokes its builder, e.g. ``st.plotly_chart(visualizations['severity_matrix']())``.
+        """
         visualizations = {}
         
         # 1. Problem Category Distribution
         if problem_analysis:
-            categories = list(problem_analysis.keys())
-            counts = [data['count'] for data in problem_analysis.values()]
-            percentages = [data['percentage'] for data in problem_analysis.values()]
-            
-            fig = make_subplots(
-                rows=1, cols=2,
-                subplot_titles=('Problem Count by Category', 'Problem Impact by Percentage'),
-                specs=[[{"type": "bar"}, {"type": "pie"}]]
-            )
-            
-            # Bar chart for counts
-            fig.add_trace(
-                go.Bar(x=categories, y=counts, name='Count', marker_color='red'),
-                row=1, col=1
-            )
-            
-            # Pie chart for percentages
-            fig.add_trace(
-                go.Pie(labels=categories, values=percentages, name='Percentage'),
-                row=1, col=2
-            )
-            
-            fig.update_layout(
-                title="Customer Problem Analysis Dashboard",
-                showlegend=True,
-                height=500
-            )
-            
-            visualizations['problem_dashboard'] = fig
+            visualizations['problem_dashboard'] = functools.partial(self._build_problem_dashboard, problem_analysis)
         
         # 2. Sentiment vs Problem Correlation
+        visualizations['sentiment_distribution'] = functools.partial(self._build_sentiment_distribution, df)
+        
+        # 3. Problem Severity Matrix / 4. Business Impact Timeline
+        if problem_analysis:
+            visualizations['severity_matrix'] = functools.partial(self._build_severity_matrix, problem_analysis)
+            visualizations['resolution_timeline'] = functools.partial(self._build_resolution_timeline, problem_analysis)
+        
+        return visualizations
+    
+    def _build_problem_dashboard(self, problem_analysis: Dict) -> go.Figure:
+        categories = list(problem_analysis.keys())
+        counts = [data['count'] for data in problem_analysis.values()]
+        percentages = [data['percentage'] for data in problem_analysis.values()]
+        
+        fig = make_subplots(
+            rows=1, cols=2,
+            subplot_titles=('Problem Count by Category', 'Problem Impact by Percentage'),
+            specs=[[{"type": "bar"}, {"type": "pie"}]]
+        )
+        
+        # Bar chart for counts
+        fig.add_trace(
+            go.Bar(x=categories, y=counts, name='Count', marker_color='red'),
+            row=1, col=1
+        )
+        
+        # Pie chart for percentages
+        fig.add_trace(
+            go.Pie(labels=categories, values=percentages, name='Percentage'),
+            row=1, col=2
+        )
+        
+        fig.update_layout(
+            title="Customer Problem Analysis Dashboard",
+            showlegend=True,
+            height=500
+        )
+        return fig
+    
+    def _build_sentiment_distribution(self, df: pd.DataFrame) -> go.Figure:
         sentiment_data = df.groupby('sentiment_label').size().reset_index(name='count')
-        fig_sentiment = px.pie(
+        return px.pie(
             sentiment_data, 
             values='count', 
             names='sentiment_label',
             title="Overall Customer Sentiment Distribution",
             color_discrete_map={'NEGATIVE': 'red', 'POSITIVE': 'green', 'NEUTRAL': 'orange'}
         )
-        visualizations['sentiment_distribution'] = fig_sentiment
-        
-        # 3. Problem Severity Matrix
-        if problem_analysis:
-            severity_data = []
-            for category, data in problem_analysis.items():
-                severity_data.append({
-                    'Category': category.title(),
-                    'Count': data['count'],
-                    'Percentage': data['percentage'],
-                    'Severity': data['severity']
-                })
-            
-            severity_df = pd.DataFrame(severity_data)
-            fig_severity = px.scatter(
-                severity_df,
-                x='Count',
-                y='Percentage',
-                color='Severity',
-                size='Count',
-                hover_data=['Category'],
-                title="Problem Severity Matrix",
-                color_discrete_map={
-                    'CRITICAL': 'red',
-                    'HIGH': 'orange', 
-                    'MEDIUM': 'yellow',
-                    'LOW': 'green'
-                }
-            )
-            visualizations['severity_matrix'] = fig_severity
-        
-        # 4. Business Impact Timeline
-        if problem_analysis:
-            timeline_data = []
-            for category, data in problem_analysis.items():
-                timeline_data.append({
-                    'Category': category.title(),
-                    'Timeline': self._get_timeline(data['severity']),
-                    'Priority': data['severity'],
-                    'Impact': data['percentage']
-                })
-            
-            timeline_df = pd.DataFrame(timeline_data)
-            fig_timeline = px.bar(
-                timeline_df,
-                x='Category',
-                y='Impact',
-                color='Priority',
-                title="Problem Resolution Timeline by Priority",
-                color_discrete_map={
-                    'CRITICAL': 'red',
-                    'HIGH': 'orange',
-                    'MEDIUM': 'yellow', 
-                    'LOW': 'green'
-                }
-            )
-            visualizations['resolution_timeline'] = fig_timeline
-        
-        return visualizations
+    
+    @staticmethod
+    def _category_frame(problem_analysis: Dict) -> pd.DataFrame:
+        """Column-wise frame of category, count, percentage and severity for the charts."""
+        return pd.DataFrame({
+            'Category': np.array([category.title() for category in problem_analysis]),
+            'Count': np.array([data['count'] for data in problem_analysis.values()], dtype=np.int32),
+            'Percentage': np.array([data['percentage'] for data in problem_analysis.values()], dtype=np.float64),
+            'Severity': np.array([data['severity'] for data in problem_analysis.values()]),
+        })
+    
+    def _build_severity_matrix(self, problem_analysis: Dict) -> go.Figure:
+        severity_df = self._category_frame(problem_analysis)
+        return px.scatter(
+            severity_df,
+            x='Count',
+            y='Percentage',
+            color='Severity',
+            size='Count',
+            hover_data=['Category'],
+            title="Problem Severity Matrix",
+            color_discrete_map={
+                'CRITICAL': 'red',
+                'HIGH': 'orange', 
+                'MEDIUM': 'yellow',
+                'LOW': 'green'
+            }
+        )
+    
+    def _build_resolution_timeline(self, problem_analysis: Dict) -> go.Figure:
+        frame = self._category_frame(problem_analysis)
+        timeline_df = pd.DataFrame({
+            'Category': frame['Category'],
+            'Timeline': frame['Severity'].map(self._get_timeline),
+            'Priority': frame['Severity'],
+            'Impact': frame['Percentage'],
+        })
+        return px.bar(
+            timeline_df,
+            x='Category',
+            y='Impact',
+            color='Priority',
+            title="Problem Resolution Timeline by Priority",
+            color_discrete_map={
+                'CRITICAL': 'red',
+                'HIGH': 'orange',
+                'MEDIUM': 'yellow', 
+                'LOW': 'green'
+            }
+        )
     
     def generate_executive_summary(self, df: pd.DataFrame, problem_analysis: Dict, business_impact: Dict) -> Dict[str, Any]:
         """Generate comprehensive executive summary with key metrics and recommendations."""
         total_feedback = len(df)
-        negative_feedback = df[df.get('sentiment_label', '') == 'NEGATIVE']
-        positive_feedback = df[df.get('sentiment_label', '') == 'POSITIVE']
+        # One counting pass instead of materialising positive/negative subsets
+        sentiment_counts = df['sentiment_label'].value_counts() if 'sentiment_label' in df.columns else pd.Series(dtype=int)
+        n_negative = int(sentiment_counts.get('NEGATIVE', 0))
+        n_positive = int(sentiment_counts.get('POSITIVE', 0))
         
-        csat_score = round((len(positive_feedback) / total_feedback) * 100, 1) if total_feedback > 0 else 0
-        dissatisfaction_rate = round((len(negative_feedback) / total_feedback) * 100, 1) if total_feedback > 0 else 0
+        csat_score = round((n_positive / total_feedback) * 100, 1) if total_feedback > 0 else 0
+        dissatisfaction_rate = round((n_negative / total_feedback) * 100, 1) if total_feedback > 0 else 0
+        totals = self._problem_totals(problem_analysis)
         
         return {
             'executive_metrics': {
@@ -401,8 +579,8 @@ class BusinessInsightsAnalyzer:
                 'brand_reputation_risk': business_impact.get('brand_reputation_risk', 'UNKNOWN')
             },
             'key_findings': [
-                f"Critical Issues: {len([cat for cat in problem_analysis.values() if cat['severity'] == 'CRITICAL'])} categories require immediate attention",
-                f"High Priority Issues: {len([cat for cat in problem_analysis.values() if cat['severity'] == 'HIGH'])} categories need urgent action",
+                f"Critical Issues: {totals.critical_count} categories require immediate attention",
+                f"High Priority Issues: {totals.high_count} categories need urgent action",
                 f"Total Problem Categories: {len(problem_analysis)} areas affecting customer experience",
                 f"Customer Satisfaction: {csat_score}% (Industry benchmark: 80%+)",
                 f"Business Risk: {business_impact.get('risk_level', 'UNKNOWN')} level risk requiring {business_impact.get('revenue_impact', 'Unknown')}"
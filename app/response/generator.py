@@ -1,9 +1,14 @@
 from __future__ import annotations
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import List
 import pandas as pd
 from pydantic import BaseModel, Field
 
+from app.utils.cache import LRUCache
+from app.utils.frames import with_columns
+
 # Groq only
 try:
 	from groq import Groq
@@ -11,6 +16,15 @@ try:
 except Exception:
 	_groq_available = False
 
+# Concurrent Groq requests per generate() call, and retries for rate-limited (429) requests
+GROQ_MAX_WORKERS = 16
+GROQ_CACHE_SIZE = 4096
+GROQ_MAX_RETRIES = 3
+GROQ_BACKOFF_SECONDS = 1.0
+
+# Groq clients shared across instances per API key, so the HTTP connection pool stays warm
+_CLIENT_CACHE: dict = {}
+
 RESPONSE_SYSTEM_PROMPT = (
 	"You are a helpful, empathetic customer support assistant. "
 	"Write concise, professional replies that acknowledge concerns, take ownership, and propose next steps."
@@ -33,8 +47,19 @@ def _default_reply(feedback: str) -> str:
 class ResponseGenerator:
 	def __init__(self, model: str | None = None):
 		self.groq_model = model or os.getenv("GROQ_MODEL", "llama-3.1-8b-instant")
-		self.use_groq = _groq_available and bool(os.getenv("GROQ_API_KEY"))
-		self._groq = Groq(api_key=os.getenv("GROQ_API_KEY")) if self.use_groq else None
+		key = os.getenv("GROQ_API_KEY")
+		self.use_groq = _groq_available and bool(key)
+		self._groq = self._get_client(key) if self.use_groq else None
+		# Per-instance LRU so repeated (feedback, sentiment, topic) inputs reuse the earlier reply;
+		# failed requests are not stored, so they are retried on the next call
+		self._reply_cache = LRUCache(GROQ_CACHE_SIZE)
+
+	@staticmethod
+	def _get_client(key: str):
+		client = _CLIENT_CACHE.get(key)
+		if client is None:
+			client = _CLIENT_CACHE.setdefault(key, Groq(api_key=key))
+		return client
 
 	def _build_user_prompt(self, item: ResponseInput) -> str:
 		return (
@@ -57,38 +82,59 @@ class ResponseGenerator:
 	def _generate_groq(self, prompt: str) -> str | None:
 		if not self._groq:
 			return None
-		try:
-			resp = self._groq.chat.completions.create(
-				model=self.groq_model,
-				messages=[
-					{"role": "system", "content": RESPONSE_SYSTEM_PROMPT},
-					{"role": "user", "content": prompt},
-				],
-				temperature=0.3,
-			)
-			return resp.choices[0].message.content.strip()
-		except Exception:
-			return None
+		for attempt in range(GROQ_MAX_RETRIES + 1):
+			try:
+				resp = self._groq.chat.completions.create(
+					model=self.groq_model,
+					messages=[
+						{"role": "system", "content": RESPONSE_SYSTEM_PROMPT},
+						{"role": "user", "content": prompt},
+					],
+					temperature=0.3,
+				)
+				return resp.choices[0].message.content.strip()
+			except Exception as e:
+				# Back off and retry when rate limited; anything else falls back to the default reply
+				if getattr(e, "status_code", None) != 429 or attempt == GROQ_MAX_RETRIES:
+					return None
+				time.sleep(GROQ_BACKOFF_SECONDS * 2 ** attempt)
+		return None
+
+	def _generate_for(self, feedback: str, sentiment: str, topic: str) -> str | None:
+		return self._generate_groq(self._build_user_prompt(ResponseInput(feedback=feedback, sentiment=sentiment, topic=topic)))
+
+	def _generate_cached(self, feedback: str, sentiment: str, topic: str) -> str | None:
+		key = (feedback, sentiment, topic)
+		reply = self._reply_cache.get(key)
+		if reply is None:
+			reply = self._generate_for(feedback, sentiment, topic)
+			if reply:
+				self._reply_cache[key] = reply
+		return reply
 
 	def generate(self, inputs: List[ResponseInput]) -> List[str]:
-		replies: List[str] = []
-		for item in inputs:
-			prompt = self._build_user_prompt(item)
-			text = self._generate_groq(prompt)
-			replies.append(text if text else _default_reply(item.feedback))
-		return replies
+		texts: List[str | None] = [None] * len(inputs)
+		if self._groq and inputs:
+			# Normalise the cache key so trivially different duplicates share one request
+			keys = [(item.feedback.strip(), item.sentiment.strip().upper(), str(item.topic).strip()) for item in inputs]
+			unique_keys = list(dict.fromkeys(keys))
+			# Requests are network-bound, so a thread pool overlaps the round-trips
+			with ThreadPoolExecutor(max_workers=min(GROQ_MAX_WORKERS, len(unique_keys))) as pool:
+				replies = dict(zip(unique_keys, pool.map(lambda key: self._generate_cached(*key), unique_keys)))
+			texts = [replies[key] for key in keys]
+		return [text if text else _default_reply(item.feedback) for item, text in zip(inputs, texts)]
 
 	def add_to_dataframe(self, df: pd.DataFrame, text_col: str, sentiment_col: str, topic_col: str) -> pd.DataFrame:
-		items = []
-		for _, row in df.iterrows():
-			# Handle NaN values by converting to empty string
-			feedback = str(row[text_col]) if pd.notna(row[text_col]) else ""
-			sentiment = str(row.get(sentiment_col, "")) if pd.notna(row.get(sentiment_col, "")) else ""
-			topic = str(row.get(topic_col, "")) if pd.notna(row.get(topic_col, "")) else ""
-			
-			items.append(ResponseInput(feedback=feedback, sentiment=sentiment, topic=topic))
+		"""Return a shallow copy of df with a `draft_response` column."""
+		# Handle NaN values by converting to empty string; the feedback column must exist,
+		# while missing sentiment/topic columns read as empty
+		feedback_values = df[text_col].fillna("")
+		optional = df.reindex(columns=[sentiment_col, topic_col]).fillna("")
+		# Values are paired positionally, so duplicate index labels are safe
+		items = [
+			ResponseInput(feedback=str(feedback), sentiment=str(sentiment), topic=str(topic))
+			for feedback, (sentiment, topic) in zip(feedback_values, optional.itertuples(index=False, name=None))
+		]
 		
 		replies = self.generate(items)
-		df = df.copy()
-		df["draft_response"] = replies
-		return df
+		return with_columns(df, draft_response=replies)
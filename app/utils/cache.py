@@ -0,0 +1,62 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Iterator, MutableMapping
+
+try:
+	import diskcache
+	_diskcache_available = True
+except Exception:
+	_diskcache_available = False
+
+# Entries kept per analyzer when predictions are cached in memory
+RESULT_CACHE_SIZE = 65536
+
+
+class LRUCache(MutableMapping):
+	"""Thread-safe mapping that evicts the least recently used entry beyond `maxsize`."""
+
+	def __init__(self, maxsize: int):
+		self.maxsize = maxsize
+		self._data: OrderedDict = OrderedDict()
+		self._lock = threading.Lock()
+
+	def __getitem__(self, key: Hashable) -> Any:
+		with self._lock:
+			value = self._data[key]
+			self._data.move_to_end(key)
+			return value
+
+	def __setitem__(self, key: Hashable, value: Any) -> None:
+		with self._lock:
+			self._data[key] = value
+			self._data.move_to_end(key)
+			while len(self._data) > self.maxsize:
+				self._data.popitem(last=False)
+
+	def __delitem__(self, key: Hashable) -> None:
+		with self._lock:
+			del self._data[key]
+
+	def __iter__(self) -> Iterator:
+		with self._lock:
+			return iter(list(self._data))
+
+	def __len__(self) -> int:
+		return len(self._data)
+
+
+def open_result_cache(cache_dir: str | None, name: str, maxsize: int = RESULT_CACHE_SIZE):
+	"""Prediction cache for one analyzer: on disk under `cache_dir` when diskcache is installed, else a bounded in-memory LRU.
+
+	Callers only use `get` and item assignment, which both backends support.
+	"""
+	if cache_dir and _diskcache_available:
+		return diskcache.Cache(os.path.join(cache_dir, name))
+	return LRUCache(maxsize)
+
+
+def result_cache_key(tag: str, text: str) -> str:
+	"""Cache key for `text` scored by the model variant described by `tag`."""
+	return hashlib.sha1(f"{tag}\0{text}".encode("utf-8")).hexdigest()
@@ -0,0 +1,12 @@
+import pandas as pd
+
+
+def with_columns(df: pd.DataFrame, **columns) -> pd.DataFrame:
+	"""Return a shallow copy of df with `columns` added or replaced.
+
+	Unlike `DataFrame.assign` without copy-on-write, existing columns are never deep-copied.
+	"""
+	out = df.copy(deep=False)
+	for name, values in columns.items():
+		out[name] = values
+	return out
@@ -1,3 +1,4 @@
+import functools
 import re
 from typing import List
 import pandas as pd
@@ -5,6 +6,8 @@ import nltk
 from nltk.corpus import stopwords
 from nltk.tokenize import word_tokenize
 
+from .frames import with_columns
+
 # Ensure NLTK resources are available
 try:
 	_ = stopwords.words("english")
@@ -16,36 +19,43 @@ URL_PATTERN = re.compile(r"https?://\S+|www\.\S+")
 HTML_TAG_PATTERN = re.compile(r"<.*?>")
 NON_ALPHANUM_PATTERN = re.compile(r"[^a-z0-9\s]")
 MULTISPACE_PATTERN = re.compile(r"\s+")
+# URLs, HTML tags and disallowed characters in one pass; keeps punctuation that
+# indicates sentiment (exclamation, question marks)
+CLEANUP_PATTERN = re.compile("|".join([URL_PATTERN.pattern, HTML_TAG_PATTERN.pattern, r"[^a-z0-9\s!?]"]))
 
 
 def clean_text(text: str) -> str:
 	"""Basic cleaning for user feedback text while preserving sentiment context."""
 	if not isinstance(text, str):
 		return ""
-	text = text.lower()
-	text = URL_PATTERN.sub(" ", text)
-	text = HTML_TAG_PATTERN.sub(" ", text)
-	# Preserve punctuation that indicates sentiment (exclamation, question marks)
-	text = re.sub(r"[^a-z0-9\s!?]", " ", text)
+	text = CLEANUP_PATTERN.sub(" ", text.lower())
 	text = MULTISPACE_PATTERN.sub(" ", text).strip()
 	return text
 
 
+@functools.lru_cache(maxsize=1)
+def _english_stopwords() -> frozenset:
+	"""English stopwords, read from the NLTK corpus once per process."""
+	return frozenset(stopwords.words("english"))
+
+
 def tokenize_text(text: str, remove_stopwords: bool = True) -> List[str]:
 	"""Tokenize feedback text into words, optionally removing stopwords."""
 	tokens = word_tokenize(text)
 	if remove_stopwords:
-		stop_words = set(stopwords.words("english"))
+		stop_words = _english_stopwords()
 		tokens = [t for t in tokens if t not in stop_words]
 	return tokens
 
 
 def preprocess_dataframe(df: pd.DataFrame, text_col: str = "feedback_text") -> pd.DataFrame:
-	"""Return a copy of df with a `clean_text` column.
-	If text_col missing, creates empty column.
+	"""Return a shallow copy of df with a `clean_text` column.
+	If text_col missing, creates empty column. Existing columns share data with df.
 	"""
-	df = df.copy()
 	if text_col not in df.columns:
-		df[text_col] = ""
-	df["clean_text"] = df[text_col].astype(str).map(clean_text)
-	return df
+		return with_columns(df, **{text_col: "", "clean_text": ""})
+	# Same steps as `clean_text`, run as column-wide string kernels; missing values become ""
+	text = df[text_col].astype("string").str.lower()
+	text = text.str.replace(CLEANUP_PATTERN, " ", regex=True)
+	text = text.str.replace(MULTISPACE_PATTERN, " ", regex=True).str.strip()
+	return with_columns(df, clean_text=text.fillna(""))
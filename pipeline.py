@@ -1,12 +1,33 @@
 from __future__ import annotations
+import contextlib
+import os
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Optional, List
+from typing import Callable, Optional, List
 import pandas as pd
 
+from app.utils.frames import with_columns
 from app.utils.preprocess import preprocess_dataframe
 from app.analysis.sentiment import SentimentAnalyzer
 from app.analysis.topics import TopicModeler
 
+try:
+	import torch
+except Exception:
+	torch = None  # type: ignore
+
+if torch is not None and "OMP_NUM_THREADS" not in os.environ:
+	# One intra-op thread per physical core (assuming SMT) and no inter-op pool;
+	# the analyzers already run concurrently on their own threads
+	torch.set_num_threads(max(1, (os.cpu_count() or 2) // 2))
+	try:
+		torch.set_num_interop_threads(1)
+	except RuntimeError:
+		pass  # only settable before torch starts any inter-op work
+
+# Intra-op thread budget shared by the analyzers that run concurrently
+TORCH_THREADS = torch.get_num_threads() if torch is not None else 0
+
 try:
 	from app.analysis.emotions import EmotionDetector  # optional
 except Exception:  # noqa: S110
@@ -28,29 +49,66 @@ class PipelineConfig:
 	sentiment_model: str = "cardiffnlp/twitter-roberta-base-sentiment-latest"
 	embedding_model: str = "all-MiniLM-L6-v2"
 	use_emotions: bool = False
+	topic_cache_dir: str | None = None  # persist fitted topic models between runs
+	precision: str = "fp16"  # topic encoder precision: "fp16" (half where supported) or "fp32"
+	onnx_path: str | None = None  # export the sentiment model to ONNX here and run it on ONNX Runtime
+	quantize: bool = True  # int8 dynamic quantization of fp32 CPU transformer models
+	result_cache_dir: str | None = None  # persist sentiment/emotion predictions per text between runs
 
 
 class FeedbackPipeline:
 	def __init__(self, config: PipelineConfig | None = None):
 		self.config = config or PipelineConfig()
-		self.sentiment = SentimentAnalyzer(model_name=self.config.sentiment_model)
-		self.topics = TopicModeler(embedding_model=self.config.embedding_model)
-		self.emotions = EmotionDetector() if (self.config.use_emotions and EmotionDetector) else None
+		self.sentiment = SentimentAnalyzer(
+			model_name=self.config.sentiment_model,
+			onnx_path=self.config.onnx_path,
+			quantize=self.config.quantize,
+			cache_dir=self.config.result_cache_dir,
+		)
+		self.topics = TopicModeler(
+			embedding_model=self.config.embedding_model,
+			cache_dir=self.config.topic_cache_dir,
+			precision=self.config.precision,
+		)
+		self.emotions = EmotionDetector(quantize=self.config.quantize, cache_dir=self.config.result_cache_dir) if (self.config.use_emotions and EmotionDetector) else None
 		self.responder = ResponseGenerator() if ResponseGenerator else None
 		self.aggregator = InsightAggregator() if InsightAggregator else None
+		# Sentiment, topics and emotions (optional) run concurrently in run()
+		self._analyzers = [self.sentiment, self.topics] + ([self.emotions] if self.emotions is not None else [])
+		if TORCH_THREADS > 1:
+			# Split torch's intra-op threads between the concurrent models so they don't
+			# oversubscribe the cores; derived from the fixed budget, so it is safe to repeat
+			torch.set_num_threads(max(1, TORCH_THREADS // len(self._analyzers)))
+
+	@staticmethod
+	def _predict_columns(analyzer, texts: List[str]) -> dict:
+		# inference_mode is thread-local, so it is entered inside each worker
+		with torch.inference_mode() if torch is not None else contextlib.nullcontext():
+			return analyzer.predict_columns(texts)
 
-	def run(self, df: pd.DataFrame, text_col: str = "feedback_text") -> pd.DataFrame:
+	def run(
+		self,
+		df: pd.DataFrame,
+		text_col: str = "feedback_text",
+		progress_cb: Callable[[str, float], None] | None = None,
+	) -> pd.DataFrame:
+		"""Run every stage over df; `progress_cb(message, fraction)` is called as each stage starts."""
+		report = progress_cb or (lambda message, fraction: None)
 		# Preprocess
+		report("Preprocessing text...", 0.0)
 		df = preprocess_dataframe(df, text_col=text_col)
-		# Sentiment
-		df = self.sentiment.add_to_dataframe(df, text_col="clean_text")
-		# Topics
-		df = self.topics.add_to_dataframe(df, text_col="clean_text")
-		# Emotions (optional)
-		if self.emotions is not None:
-			df = self.emotions.add_to_dataframe(df, text_col="clean_text")
+		# Sentiment, topics and emotions (optional) share one text column and run
+		# concurrently; model forwards release the GIL
+		texts = df["clean_text"].fillna("").astype(str).tolist()
+		columns = {}
+		report("Analyzing sentiment, topics and emotions..." if self.emotions is not None else "Analyzing sentiment and topics...", 0.1)
+		with ThreadPoolExecutor(max_workers=len(self._analyzers)) as pool:
+			for result in pool.map(lambda analyzer: self._predict_columns(analyzer, texts), self._analyzers):
+				columns.update(result)
+		df = with_columns(df, **columns)
 		# Responses
 		if self.responder is not None:
+			report("Generating responses...", 0.6)
 			df = self.responder.add_to_dataframe(
 				df,
 				text_col=text_col,
@@ -59,6 +117,8 @@ class FeedbackPipeline:
 			)
 		# Insights
 		if self.aggregator is not None:
+			report("Aggregating insights...", 0.8)
 			insights = self.aggregator.aggregate(df)
 			df.attrs["insights"] = insights
+		report("Analysis complete!", 1.0)
 		return df
@@ -1,19 +1,39 @@
+import functools
+import importlib.util
 import os
 import io
 import pandas as pd
 import streamlit as st
-import plotly.express as px
-from pipeline import FeedbackPipeline, PipelineConfig
+from packaging.version import Version
+from app.utils.frames import with_columns
+
+# Plotly and the pipeline (which pulls in the transformer stack) are imported on
+# first use, so the sidebar renders without paying for them
+
+# Derived frames share column data until written to, so cleaning never needs a defensive copy;
+# pandas 3 always behaves this way and deprecates the option
+if Version(pd.__version__) < Version("3"):
+	pd.options.mode.copy_on_write = True
+
+# Arrow's multithreaded CSV parser when pyarrow is installed, else pandas' C parser
+CSV_ENGINE = "pyarrow" if importlib.util.find_spec("pyarrow") is not None else "c"
 
 st.set_page_config(page_title="AI Feedback Analyzer", layout="wide")
 st.title("AI-Driven Customer Feedback Analyzer & Response Generator")
 
-# Global Plotly styling for a formal look
-px.defaults.template = "plotly_white"
-px.defaults.color_discrete_sequence = [
-	"#2E77B8", "#E15759", "#76B7B2", "#F28E2B", "#59A14F", "#EDC948",
-	"#B07AA1", "#FF9DA7", "#9C755F", "#BAB0AC"
-]
+
+@functools.lru_cache(maxsize=1)
+def _plotly_express():
+	"""Import plotly.express and apply the app-wide styling once."""
+	import plotly.express as px
+	# Global Plotly styling for a formal look
+	px.defaults.template = "plotly_white"
+	px.defaults.color_discrete_sequence = [
+		"#2E77B8", "#E15759", "#76B7B2", "#F28E2B", "#59A14F", "#EDC948",
+		"#B07AA1", "#FF9DA7", "#9C755F", "#BAB0AC"
+	]
+	return px
+
 
 # Subtle, formal CSS styling
 st.markdown(
@@ -49,43 +69,41 @@ with st.sidebar:
 
 def _read_df(file) -> pd.DataFrame:
 	"""Read CSV/Excel file without caching to ensure fresh data."""
+	# Every column is read: all of them are kept for the results table and the download
 	if isinstance(file, str):
 		lower = file.lower()
 		if lower.endswith(".csv"):
-			return pd.read_csv(file)
+			return pd.read_csv(file, engine=CSV_ENGINE)
 		return pd.read_excel(file)
 	if hasattr(file, "name") and file.name.lower().endswith(".csv"):
-		return pd.read_csv(file)
+		return pd.read_csv(file, engine=CSV_ENGINE)
 	return pd.read_excel(file)
 
 def _detect_feedback_column(df: pd.DataFrame) -> str:
 	"""Simple detection - just find the first text column."""
-	# Look for any text column
-	for col in df.columns:
-		if df[col].dtype == 'object':  # String columns
-			return col
-	
-	# Fallback to first column
-	return df.columns[0]
+	# First string column, falling back to the first column
+	text_cols = df.select_dtypes(include=["object", "string"]).columns
+	return text_cols[0] if len(text_cols) else df.columns[0]
 
 def _clean_dataframe(df: pd.DataFrame, feedback_col: str) -> pd.DataFrame:
 	"""Keep all columns but ensure feedback column exists."""
-	# Keep all original columns
-	clean_df = df.copy()
+	# Remove rows with missing or blank feedback in a single mask
+	feedback = df[feedback_col]
+	mask = feedback.notna() & feedback.astype(str).str.strip().ne('')
+	clean_df = df if mask.all() else df.loc[mask]
 	
 	# If feedback column is not 'feedback_text', add it
 	if feedback_col != 'feedback_text':
-		clean_df['feedback_text'] = clean_df[feedback_col]
-	
-	# Remove rows with empty feedback
-	clean_df = clean_df.dropna(subset=['feedback_text'])
-	clean_df = clean_df[clean_df['feedback_text'].astype(str).str.strip() != '']
+		clean_df = with_columns(clean_df, feedback_text=clean_df[feedback_col])
 	
 	return clean_df
 
-def _get_pipeline(use_emotions: bool) -> FeedbackPipeline:
-	"""Create a fresh pipeline instance for each analysis."""
-	cfg = PipelineConfig(use_emotions=use_emotions)
+@st.cache_resource(show_spinner="Loading models...")
+def _get_pipeline(use_emotions: bool) -> "FeedbackPipeline":
+	"""Build the pipeline once per configuration and reuse its loaded models across reruns."""
+	from pipeline import FeedbackPipeline, PipelineConfig
+	# Model predictions and embeddings are cached per feedback text, so results stay fresh
+	cfg = PipelineConfig(use_emotions=use_emotions, result_cache_dir=".cache", topic_cache_dir=".cache/topics")
 	return FeedbackPipeline(cfg)
 
 col1, col2 = st.columns([1, 1])
@@ -94,6 +112,7 @@ def _display_insights(df: pd.DataFrame):
 	insights = df.attrs.get("insights") if hasattr(df, "attrs") else None
 	if not insights:
 		return
+	px = _plotly_express()
 
 	# Enhanced Business Insights - Formal, tabbed UI
 	st.header("🎯 Business Insights")
@@ -131,11 +150,7 @@ def _display_insights(df: pd.DataFrame):
 				st.markdown("• " + str(finding))
 			if problem_analysis.get("problem_categories"):
 				short_issues = []
-				for category, data in sorted(
-					problem_analysis["problem_categories"].items(),
-					key=lambda x: (x[1]["severity"], x[1]["percentage"]),
-					reverse=True,
-				):
+				for category, data in problem_analysis.get("sorted_categories", []):
 					short_issues.append(f"{category.title()} ({data['severity']}, {data['percentage']}%)")
 				if short_issues:
 					st.markdown("**Issues (short):** " + ", ".join(short_issues))
@@ -151,6 +166,7 @@ def _display_insights(df: pd.DataFrame):
 						"Problem Category": category.title(),
 						"Count": data["count"],
 						"Percentage": f"{data['percentage']}%",
+						"Avg Sentiment Score": data["avg_sentiment_score"],
 						"Severity": data["severity"],
 						"Business Impact": data["business_impact"]
 					})
@@ -164,8 +180,8 @@ def _display_insights(df: pd.DataFrame):
 				from app.insights.business_insights import BusinessInsightsAnalyzer
 				analyzer = BusinessInsightsAnalyzer()
 				visualizations = analyzer.create_visualizations(df, problem_categories)
-				for _, fig in visualizations.items():
-					st.plotly_chart(fig, use_container_width=True)
+				for _, build in visualizations.items():
+					st.plotly_chart(build(), use_container_width=True)
 
 		# Recommendations
 		with _tab_recs:
@@ -201,6 +217,22 @@ def _display_insights(df: pd.DataFrame):
 				tc = insights["topic_counts"]
 				bar = px.bar(x=[str(k) for k in tc.keys()], y=list(tc.values()), title="Topic Counts", labels={"x": "Topic", "y": "Count"})
 				st.plotly_chart(bar, use_container_width=True)
+			# Per-category evidence; counts and severity are in the Problem Analysis tab
+			if problem_analysis.get("problem_categories"):
+				st.subheader("🔍 Detailed Problem Analysis")
+				# Already sorted by severity and impact
+				for category, data in problem_analysis.get("sorted_categories", []):
+					with st.expander(f"🚨 {category.title()} Issues - {data['severity']} Priority", expanded=data['severity'] == 'CRITICAL'):
+						# Sample feedback
+						if data.get('sample_feedback'):
+							st.write("**Sample Customer Feedback:**")
+							for feedback in data['sample_feedback']:
+								st.text("• " + str(feedback.get('feedback', '')))
+						
+						# Solutions
+						st.write("**Recommended Solutions:**")
+						for solution in data.get('solutions', []):
+							st.markdown("• " + str(solution))
 
 # Resolve input dataframe based on selection
 input_df: pd.DataFrame | None = None
@@ -257,83 +289,24 @@ if analyze_btn:
 	if st.button("View input data"):
 		st.dataframe(input_df.head(), use_container_width=True)
 	
-	# Clear any cached results to ensure fresh analysis
-	st.cache_data.clear()
-	
 	with st.spinner("Analyzing feedback..."):
-		# Create fresh pipeline instance (no caching)
-		cfg = PipelineConfig(use_emotions=use_emotions)
-		pipeline = FeedbackPipeline(cfg)
+		pipeline = _get_pipeline(use_emotions)
 		
-		# Show progress steps
+		# Progress is reported by the pipeline as each stage starts
 		progress_bar = st.progress(0)
 		status_text = st.empty()
 		
-		status_text.text("Preprocessing text...")
-		progress_bar.progress(20)
+		def _report_progress(message: str, fraction: float) -> None:
+			status_text.text(message)
+			progress_bar.progress(fraction)
 		
-		status_text.text("Analyzing sentiment...")
-		progress_bar.progress(40)
+		result_df = pipeline.run(input_df, text_col="feedback_text", progress_cb=_report_progress)
 		
-		status_text.text("Finding topics...")
-		progress_bar.progress(60)
-		
-		status_text.text("Generating responses...")
-		progress_bar.progress(80)
-		
-		status_text.text("Aggregating insights...")
-		progress_bar.progress(100)
-		
-		result_df = pipeline.run(input_df, text_col="feedback_text")
-		
-		status_text.text("Analysis complete!")
 		progress_bar.empty()
 		status_text.empty()
 		
 		_display_insights(result_df)
 		
-		# Enhanced Business Insights Section
-		if "business_insights" in result_df.attrs.get("insights", {}):
-			business_insights = result_df.attrs["insights"]["business_insights"]
-			problem_analysis = business_insights.get("problem_analysis", {})
-			
-			# Detailed Problem Analysis
-			if problem_analysis.get("problem_categories"):
-				st.subheader("🔍 Detailed Problem Analysis")
-				problem_categories = problem_analysis["problem_categories"]
-				
-				# Sort by severity and impact
-				sorted_problems = sorted(
-					problem_categories.items(), 
-					key=lambda x: (x[1]['severity'], x[1]['percentage']), 
-					reverse=True
-				)
-				
-				for category, data in sorted_problems:
-					with st.expander(f"🚨 {category.title()} Issues - {data['severity']} Priority", expanded=data['severity'] == 'CRITICAL'):
-						col1, col2 = st.columns([1, 1])
-						
-						with col1:
-							st.metric("Affected Customers", data['count'])
-							st.metric("Impact Percentage", f"{data['percentage']}%")
-							st.metric("Business Impact", data['business_impact'])
-						
-						with col2:
-							st.metric("Severity Level", data['severity'])
-							st.metric("Timeline", data.get('timeline', '2-4 weeks'))
-							st.metric("ROI Estimate", data.get('roi_estimate', '25% ROI'))
-						
-						# Sample feedback
-						if data.get('sample_feedback'):
-							st.write("**Sample Customer Feedback:**")
-							for feedback in data['sample_feedback']:
-								st.text("• " + str(feedback.get('feedback', '')))
-						
-						# Solutions
-						st.write("**Recommended Solutions:**")
-						for solution in data.get('solutions', []):
-							st.markdown("• " + str(solution))
-			
 		st.subheader("📊 Analysis Results")
 		st.dataframe(result_df, use_container_width=True)
 		
@@ -350,7 +323,10 @@ if analyze_btn:
 				st.metric("Confidence", f"{sample.get('sentiment_score', 0):.2f}")
 		
 		# Download
-		csv_bytes = result_df.to_csv(index=False).encode("utf-8")
-		st.download_button("Download CSV", data=csv_bytes, file_name="feedback_analysis.csv", mime="text/csv")
+		# Encode straight into a byte buffer instead of building the whole CSV as a str first
+		csv_buffer = io.BytesIO()
+		result_df.to_csv(csv_buffer, index=False, encoding="utf-8")
+		csv_buffer.seek(0)
+		st.download_button("Download CSV", data=csv_buffer, file_name="feedback_analysis.csv", mime="text/csv")
 else:
 	st.info("Choose an input method, then click Analyze.")
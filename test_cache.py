@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Test the prediction caches shared by the analyzers.
+"""
+
+from unittest import mock
+
+from app.utils import cache
+from app.utils.cache import LRUCache, open_result_cache, result_cache_key
+
+
+def test_lru_evicts_least_recently_used():
+    lru = LRUCache(maxsize=3)
+    for key in "abc":
+        lru[key] = key.upper()
+    assert list(lru) == ["a", "b", "c"]
+
+    # Reading "a" makes "b" the oldest entry
+    assert lru["a"] == "A"
+    lru["d"] = "D"
+    assert list(lru) == ["c", "a", "d"]
+    assert "b" not in lru
+
+    # Overwriting an entry also refreshes it
+    lru["c"] = "C2"
+    lru["e"] = "E"
+    assert list(lru) == ["d", "c", "e"]
+    assert len(lru) == 3
+    assert lru.get("a") is None
+
+
+def test_open_result_cache_without_cache_dir_is_in_memory():
+    result_cache = open_result_cache(None, "sentiment", maxsize=2)
+    assert isinstance(result_cache, LRUCache)
+    assert result_cache.maxsize == 2
+
+
+def test_open_result_cache_without_diskcache_is_in_memory(tmp_path):
+    with mock.patch.object(cache, "_diskcache_available", False):
+        result_cache = open_result_cache(str(tmp_path), "sentiment")
+    assert isinstance(result_cache, LRUCache)
+    assert not (tmp_path / "sentiment").exists()
+
+
+def test_model_variants_do_not_share_keys():
+    from app.analysis import models
+
+    # Pin the resolved dtype so the int8 variant is actually distinct on every machine
+    with mock.patch.object(models, "inference_dtype", return_value=None), \
+            mock.patch.object(models, "_torch_available", True):
+        tags = {
+            models.model_variant_tag("model-a"),
+            models.model_variant_tag("model-a", quantize=True),
+            models.model_variant_tag("model-a", device=0),
+            models.model_variant_tag("model-b"),
+        }
+    assert len(tags) == 4
+
+    keys = {result_cache_key(tag, "The delivery was late") for tag in tags}
+    assert len(keys) == 4
+    assert result_cache_key("model-a", "text") == result_cache_key("model-a", "text")
+
+
+if __name__ == "__main__":
+    import pathlib
+    import tempfile
+
+    test_lru_evicts_least_recently_used()
+    test_open_result_cache_without_cache_dir_is_in_memory()
+    with tempfile.TemporaryDirectory() as tmp:
+        test_open_result_cache_without_diskcache_is_in_memory(pathlib.Path(tmp))
+    test_model_variants_do_not_share_keys()
+    print("Cache tests passed.")
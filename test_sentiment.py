@@ -3,9 +3,19 @@
 Quick test script to verify sentiment analysis improvements.
 """
 
-from app.analysis.sentiment import SentimentAnalyzer
+from unittest import mock
+
+import numpy as np
+
+from app.analysis.sentiment import SentimentAnalyzer, TOKEN_PATTERN, _count_polarity
 from app.utils.preprocess import clean_text
 
+
+def _rule_based_analyzer():
+    # Keep the transformer out of it so only the keyword rules are exercised
+    with mock.patch("app.analysis.models.get_pipeline", side_effect=RuntimeError("no model in tests")):
+        return SentimentAnalyzer()
+
 def test_sentiment():
     # Test with the problematic feedback
     test_feedback = [
@@ -30,5 +40,48 @@ def test_sentiment():
         rule_result = analyzer._rule_based_sentiment(clean_fb)
         print(f"   Rule-based: {rule_result['label']} (confidence: {rule_result['score']:.3f})")
 
+def test_negation_flips_next_word():
+    analyzer = _rule_based_analyzer()
+    assert analyzer._analyze_tokens("good") == (1, 0)
+    assert analyzer._analyze_tokens("not good") == (0, 1)
+    assert analyzer._analyze_tokens("never slow") == (1, 0)
+
+
+def test_negation_does_not_cross_punctuation():
+    analyzer = _rule_based_analyzer()
+    assert analyzer._analyze_tokens("not. good") == (1, 0)
+    assert analyzer._analyze_tokens("no, bad") == (0, 1)
+
+
+def test_repeated_polarity_word_counted_once():
+    analyzer = _rule_based_analyzer()
+    assert analyzer._analyze_tokens("good good good") == (1, 0)
+    assert analyzer._analyze_tokens("late, late and late again") == (0, 1)
+
+
+def test_multi_word_phrases():
+    analyzer = _rule_based_analyzer()
+    assert analyzer._analyze_tokens("long lines at the counter") == (0, 1)
+    assert analyzer._analyze_tokens("milk was out of stock") == (0, 1)
+    assert analyzer._analyze_tokens("long lines and out of stock, long lines") == (0, 2)
+    assert analyzer._rule_based_sentiment("Long lines and items out of stock")["label"] == "NEGATIVE"
+
+
+def test_fallback_kernel_matches_njit():
+    analyzer = _rule_based_analyzer()
+    # With numba the dispatcher keeps the plain Python function as py_func; without it they are the same
+    python_kernel = getattr(_count_polarity, "py_func", _count_polarity)
+    texts = ["not good", "not. good", "good good bad", "never slow, not helpful", "no problem", "", "nothing"]
+    for text in texts:
+        stream = TOKEN_PATTERN.findall(text)
+        ids = np.array([analyzer._vocab.get(t, -1) for t in stream], dtype=np.int32)
+        assert tuple(_count_polarity(ids, analyzer._kind)) == tuple(python_kernel(ids, analyzer._kind)), text
+
+
 if __name__ == "__main__":
+    test_negation_flips_next_word()
+    test_negation_does_not_cross_punctuation()
+    test_repeated_polarity_word_counted_once()
+    test_multi_word_phrases()
+    test_fallback_kernel_matches_njit()
     test_sentiment()